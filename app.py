@@ -7,7 +7,7 @@ from flask_cors import CORS
 import os
 import uuid
 from werkzeug.utils import secure_filename
-import json
+import orjson
 import jwt
 from search_recommendation import outfit_recommendation_with_cleaned_data
 import traceback
@@ -1130,7 +1130,7 @@ def redo_search():
         conversation_context['image_bytes'] = image_result['image_bytes']
 
         # Now, with the image bytes, proceed with the redo operation
-        from search_recommendation import redo_search_queries, search_items_parallel, clean_search_results_for_frontend
+        from search_recommendation import redo_search_queries, search_items_parallel, clean_search_results_for_frontend, clean_search_queries
 
         redo_result = redo_search_queries(conversation_context, feedback_message)
 
@@ -1138,13 +1138,16 @@ def redo_search():
             return jsonify({'error': redo_result["error"]}), 500
 
         new_queries = redo_result.get("queries", [])
+        if isinstance(new_queries, list):
+            new_queries = clean_search_queries(new_queries)
         if not new_queries or "error" in new_queries:
             return jsonify({'error': 'Failed to generate new search queries'}), 500
 
         country = data.get('country', 'us')
         language = data.get('language', 'en')
 
-        search_results = search_items_parallel(new_queries, country=country, language=language)
+        # The user asked for different results, so don't serve cached ones
+        search_results = search_items_parallel(new_queries, country=country, language=language, ignore_cache=True)
         cleaned_data = clean_search_results_for_frontend(search_results)
 
         # Update the session in the database
@@ -1223,8 +1226,8 @@ def get_results(file_id):
         results_file = sorted(results_files)[-1]
         results_path = os.path.join(app.config['RESULTS_FOLDER'], results_file)
         
-        with open(results_path, 'r', encoding='utf-8') as f:
-            cleaned_data = json.load(f)
+        with open(results_path, 'rb') as f:
+            cleaned_data = orjson.loads(f.read())
         
         return jsonify({
             'success': True,
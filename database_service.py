@@ -174,11 +174,13 @@ class DatabaseService:
             if items_to_insert:
                 response = client.table("clothing_items").insert(items_to_insert).execute()
                 
-                # Save products for each clothing item
+                # Save the products of all clothing items in one insert
                 if response.data:
+                    products_by_item = {}
                     for i, clothing_item_record in enumerate(response.data):
                         if i < len(clothing_items) and "products" in clothing_items[i]:
-                            self.save_products(clothing_item_record["id"], clothing_items[i]["products"], True)  # Always pass True
+                            products_by_item[clothing_item_record["id"]] = clothing_items[i]["products"]
+                    self.save_products_bulk(products_by_item)
                 
                 return True
             return False
@@ -188,36 +190,66 @@ class DatabaseService:
     
     def save_products(self, clothing_item_id: str, products: List[Dict], use_service_client: bool = True) -> bool:
         """Save products for a clothing item with optional direct links"""
+        return self.save_products_bulk({clothing_item_id: products})
+    
+    def save_products_bulk(self, products_by_item: Dict[str, List[Dict]]) -> bool:
+        """
+        Save products for several clothing items in a single insert
+        
+        If the combined insert fails (e.g. one bad product row), each clothing item's products
+        are inserted separately, so a bad row only loses the products of its own item. Returns
+        True only if the products of every item were saved.
+        """
         try:
             # Always use service client for backend operations
             client = self.service_client
             
-            products_to_insert = []
-            for product in products:
-                product_data = {
-                    "clothing_item_id": clothing_item_id,
-                    "external_id": product.get("id"),
-                    "title": product.get("title", ""),
-                    "price": self._parse_price(product.get("price_numeric")),
-                    "old_price": self._parse_price(product.get("old_price_numeric")),
-                    "discount_percentage": self._parse_int(product.get("discount_percentage")),
-                    "image_url": product.get("image_url"),
-                    "product_url": product.get("product_url"),
-                    "source": product.get("source", ""),
-                    "source_icon": product.get("source_icon"),
-                    "rating": self._parse_float(product.get("rating")),
-                    "review_count": self._parse_int(product.get("review_count")),
-                    "delivery_info": product.get("delivery_info"),
-                    "tags": product.get("tags", [])
-                }
-                products_to_insert.append(product_data)
+            rows_by_item = {}
+            for clothing_item_id, products in products_by_item.items():
+                rows = []
+                for product in products:
+                    product_data = {
+                        "clothing_item_id": clothing_item_id,
+                        "external_id": product.get("id"),
+                        "title": product.get("title", ""),
+                        "price": self._parse_price(product.get("price_numeric")),
+                        "old_price": self._parse_price(product.get("old_price_numeric")),
+                        "discount_percentage": self._parse_int(product.get("discount_percentage")),
+                        "image_url": product.get("image_url"),
+                        "product_url": product.get("product_url"),
+                        "source": product.get("source", ""),
+                        "source_icon": product.get("source_icon"),
+                        "rating": self._parse_float(product.get("rating")),
+                        "review_count": self._parse_int(product.get("review_count")),
+                        "delivery_info": product.get("delivery_info"),
+                        "tags": product.get("tags", [])
+                    }
+                    rows.append(product_data)
+                if rows:
+                    rows_by_item[clothing_item_id] = rows
+            
+            if not rows_by_item:
+                return False
             
-            if products_to_insert:
+            products_to_insert = [row for rows in rows_by_item.values() for row in rows]
+            try:
                 response = client.table("products").insert(products_to_insert).execute()
-                if response.data:
-                    return True
-                return False
-            return False
+                return bool(response.data)
+            except Exception as e:
+                if len(rows_by_item) == 1:
+                    raise
+                logger.warning(f"Bulk product insert failed, retrying per clothing item: {e}")
+            
+            all_saved = True
+            for clothing_item_id, rows in rows_by_item.items():
+                try:
+                    response = client.table("products").insert(rows).execute()
+                    if not response.data:
+                        all_saved = False
+                except Exception as e:
+                    logger.error(f"Error saving products for clothing item {clothing_item_id}: {e}")
+                    all_saved = False
+            return all_saved
         except Exception as e:
             logger.error(f"Error saving products: {e}")
             return False
@@ -1,61 +1,122 @@
 import os
 from dotenv import load_dotenv
-from openai import OpenAI
 import re
-import base64
+import hashlib
+import gzip
+import io
 import json
-import pandas as pd
+import orjson
+import csv
 from pathlib import Path
 import time
-import datetime
 import concurrent.futures
+from collections import OrderedDict
+from functools import lru_cache
+from itertools import chain
 from google import genai
 from google.genai import types
-from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
-from serpapi.google_search import GoogleSearch as SerpAPISearch
+from google.genai.types import GenerateContentConfig
+from PIL import Image, ImageOps
 import requests
-    
-import time
-import random
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, parse_qs, unquote
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
 from datetime import datetime
-import json
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 genai_client = genai.Client(api_key=os.getenv("GOOGLE_API_KEY"))
 SERPAPI_KEY = os.getenv("SERPAPI_API_KEY")
-
-def encode_image(image_path):
-    with open(image_path, "rb") as image_file:
-        return base64.b64encode(image_file.read()).decode("utf-8")
-                
-
-def create_search_query_gemini(image_path, return_conversation=False):
-    """
-    Create search query for each clothing item in the image
-    
-    Parameters:
-    - image_path: Path to the image file
-    - return_conversation: If True, returns both queries and conversation context
-    
-    Returns:
-    - If return_conversation=False: List of search queries or error dict
-    - If return_conversation=True: Dict with 'queries', 'conversation_history', 'image_bytes', and 'system_prompt'
-    """
-    if not image_path:
-        return {"error": "No image provided"}
-    
-    try:
-        # Read the image file
-        with open(image_path, "rb") as image_file:
-            image_bytes = image_file.read()
-        
-        # System instructions
-        system_prompt = """You are a professional fashion researcher specializing in generating precise search queries for clothing identification. When provided with an image containing clothing items, you will analyze each piece and generate specific search queries that can be used to find near-identical replicas online.
+SERPAPI_SEARCH_URL = "https://serpapi.com/search.json"
+SERPAPI_MAX_CONCURRENCY = 8
+# Read timeout for each SerpAPI attempt. A timed-out attempt is not resent: SerpAPI may
+# still run (and bill) the search, so only throttled or failed responses are retried
+SERPAPI_REQUEST_TIMEOUT = 20
+# Throttled (429) and failed (5xx) responses are retried up to SERPAPI_MAX_RETRIES times with
+# exponential backoff, honouring Retry-After
+SERPAPI_MAX_RETRIES = 3
+SERPAPI_RETRY_BACKOFF_FACTOR = 0.3
+SERPAPI_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Searches still running this long after results start being collected are abandoned. The
+# deadline wins over the retry budget: a retry whose backoff would end past the deadline is
+# not made, and the last response is returned instead
+SERPAPI_SEARCH_DEADLINE_SECONDS = 25
+# Sustained SerpAPI request rate across all threads; short bursts up to this many requests
+# are allowed before requests are spaced out
+SERPAPI_REQUESTS_PER_SECOND = 5
+
+# SerpAPI response cache: an in-process LRU in front of an on-disk store
+SERP_CACHE_DIR = ".serp_cache"
+SERP_CACHE_TTL_SECONDS = 24 * 60 * 60
+SERP_MEMORY_CACHE_SIZE = 2048
+# Expired files in the on-disk caches are swept at most this often per cache directory
+CACHE_SWEEP_INTERVAL_SECONDS = 60 * 60
+
+class TokenBucket:
+    """Thread-safe token bucket that allows `rate` acquisitions per second on average"""
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Take a token, sleeping until one is available"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# Shared HTTP session so SerpAPI requests reuse keep-alive connections
+# instead of paying a TCP + TLS handshake per query. Only failed connection attempts are
+# retried here (the request was never sent); status retries happen in search_shopping_item
+# so the concurrency slot is not held while backing off
+_SERP_SESSION = requests.Session()
+_SERP_SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    max_retries=Retry(total=2, read=0, status=0, backoff_factor=SERPAPI_RETRY_BACKOFF_FACTOR)
+))
+
+# Word tokens compared when folding duplicate search queries together
+_QUERY_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Caps in-flight SerpAPI requests across all concurrent searches in this process
+_SERP_SEMAPHORE = threading.Semaphore(SERPAPI_MAX_CONCURRENCY)
+_SERP_RATE_LIMITER = TokenBucket(SERPAPI_REQUESTS_PER_SECOND)
+
+_serp_memory_cache = OrderedDict()
+_serp_memory_cache_lock = threading.Lock()
+
+_cache_last_swept = {}
+_cache_sweep_lock = threading.Lock()
+
+# Long-lived pool for SerpAPI searches, so requests don't pay thread start-up per outfit.
+# Sized above the concurrency cap so searches from concurrent requests can queue on the
+# semaphore instead of on the pool
+_SERP_SEARCH_EXECUTOR = ThreadPoolExecutor(max_workers=2 * SERPAPI_MAX_CONCURRENCY, thread_name_prefix="serpapi")
+
+# Background writer for result files, so disk writes overlap with result processing
+_RESULTS_IO_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="results-io")
+
+GEMINI_MODEL = 'gemini-2.5-flash-preview-05-20'
+
+# Images are downscaled and re-encoded before upload; Gemini downsamples larger inputs anyway
+GEMINI_IMAGE_MAX_SIZE = 1024
+GEMINI_IMAGE_QUALITY = 80
+
+# System instructions for clothing identification
+GEMINI_SYSTEM_PROMPT = """You are a professional fashion researcher specializing in generating precise search queries for clothing identification. When provided with an image containing clothing items, you will analyze each piece and generate specific search queries that can be used to find near-identical replicas online.
 
 ANALYSIS FRAMEWORK:
 For each clothing piece, create a google shopping search query (10-15 words max) that captures the most distinctive features in this priority order:
@@ -99,38 +160,339 @@ Always return your response as a JSON array of strings, with each string being a
 EXAMPLE OUTPUTS:
 ["women's emerald green satin wrap blouse long sleeves", "men's charcoal wool blend oversized bomber jacket", "black leather high-waisted straight leg pants"]
 """
+
+# User prompt sent alongside a single outfit image
+GEMINI_USER_PROMPT = """Analyze this image and generate specific search queries for each clothing piece that will help me find near-identical replicas online. Return the results as an array of search queries. For example, ["women's emerald green satin wrap blouse long sleeves", "men's charcoal wool blend oversized bomber jacket", "black leather high-waisted straight leg pants"]. However, if there are no clothing items in the image, return an empty array, like so: []."""
+
+# Redo conversations keep the image prompt and first reply plus this many of the most recent
+# feedback/response rounds, so each redo re-sends a bounded history
+GEMINI_REDO_MAX_TURNS = 4
+
+# Gemini is asked for JSON output matching this schema, so responses parse as-is
+GEMINI_JSON_MIME_TYPE = "application/json"
+GEMINI_QUERIES_SCHEMA = {"type": "ARRAY", "items": {"type": "STRING"}}
+
+# Gemini query responses are cached on disk per image; the prompt version is derived from the
+# prompts so editing them invalidates the cache
+GEMINI_CACHE_DIR = ".gemini_cache"
+GEMINI_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+GEMINI_PROMPT_VERSION = hashlib.blake2b(
+    f"{GEMINI_SYSTEM_PROMPT}|{GEMINI_USER_PROMPT}".encode("utf-8"), digest_size=8
+).hexdigest()
+
+
+# Characters that matter when matching the brackets of a JSON array
+_JSON_ARRAY_TOKEN_RE = re.compile(r'[\[\]"\\]')
+
+
+def extract_json_array(text, start):
+    """
+    Return the bracket-balanced span of text starting at the '[' at index start
+    
+    Brackets inside JSON strings are ignored. The scan jumps between brackets, quotes and
+    backslashes, so ordinary text is skipped at C speed.
+    
+    Returns:
+    - The array text, or None if the brackets never balance
+    """
+    depth = 0
+    in_string = False
+    escaped_pos = -1
+    
+    for match in _JSON_ARRAY_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == escaped_pos:
+            continue
         
-        # User prompt
-        user_prompt = """Analyze this image and generate specific search queries for each clothing piece that will help me find near-identical replicas online. Return the results as an array of search queries. For example, ["women's emerald green satin wrap blouse long sleeves", "men's charcoal wool blend oversized bomber jacket", "black leather high-waisted straight leg pants"]. However, if there are no clothing items in the image, return an empty array, like so: []."""
+        char = match.group()
+        if in_string:
+            if char == '\\':
+                escaped_pos = pos + 1
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+            if depth == 0:
+                return text[start:pos + 1]
+    
+    return None
+
+
+def parse_json_array_response(response_text):
+    """
+    Parse the JSON array of search queries from a Gemini response
+    
+    The response is parsed as-is first, which is the common case. If the model wrapped the
+    array in other text, the span from the first '[' to the last ']' is tried, and then
+    each bracket-balanced span in turn.
+    
+    Raises:
+    - json.JSONDecodeError if no JSON array can be parsed
+    """
+    try:
+        items = orjson.loads(response_text)
+        if isinstance(items, list):
+            return items
+    except orjson.JSONDecodeError:
+        pass
+    
+    # Usually the array is everything from the first '[' to the last ']'
+    start = response_text.find('[')
+    end = response_text.rfind(']')
+    if start != -1 and end > start:
+        try:
+            items = orjson.loads(response_text[start:end + 1])
+            if isinstance(items, list):
+                return items
+        except orjson.JSONDecodeError:
+            pass
+    
+    # Otherwise try each bracketed span in turn, so stray brackets in the prose are skipped
+    while start != -1:
+        candidate = extract_json_array(response_text, start)
+        if candidate is None:
+            break
+        try:
+            items = orjson.loads(candidate)
+            if isinstance(items, list):
+                return items
+        except orjson.JSONDecodeError:
+            pass
+        start = response_text.find('[', start + 1)
+    
+    return orjson.loads(response_text)
+
+
+def build_image_message(image_bytes, prompt_text):
+    """Build the user message that pairs the outfit image with its text prompt"""
+    return {
+        "role": "user",
+        "parts": [
+            types.Part.from_bytes(data=image_bytes, mime_type='image/jpeg'),
+            {"text": prompt_text}
+        ]
+    }
+
+
+def load_image_for_gemini(image_path=None, image_bytes=None):
+    """
+    Read an outfit image as JPEG bytes sized for Gemini
+    
+    The image is read from image_path unless its bytes are passed in as image_bytes. It is
+    shrunk to fit GEMINI_IMAGE_MAX_SIZE on its longest edge and re-encoded as JPEG. The
+    original bytes are returned if the image cannot be decoded or the re-encoded version
+    would not be smaller.
+    """
+    if image_bytes is None:
+        image_bytes = Path(image_path).read_bytes()
+    
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((GEMINI_IMAGE_MAX_SIZE, GEMINI_IMAGE_MAX_SIZE), Image.LANCZOS)
+            buffer = io.BytesIO()
+            image.convert("RGB").save(buffer, "JPEG", quality=GEMINI_IMAGE_QUALITY, optimize=True)
+    except Exception as e:
+        print(f"Warning: Could not resize image, sending original - {e}")
+        return image_bytes
+    
+    slimmed_bytes = buffer.getvalue()
+    return slimmed_bytes if len(slimmed_bytes) < len(image_bytes) else image_bytes
+
+
+def iter_json_array_strings(text_chunks):
+    """
+    Incrementally yield the string elements of the first JSON array in a stream of text
+    
+    Each string is yielded as soon as its closing quote arrives, so callers can act on
+    early elements while the rest of the response is still streaming. Text before the
+    array and after its closing bracket is ignored.
+    
+    Parameters:
+    - text_chunks: Iterable of response text chunks
+    
+    Yields:
+    - Decoded top-level string elements of the array, in order
+    """
+    depth = 0
+    finished = False
+    in_string = False
+    escaped = False
+    current = []
+    
+    for chunk in text_chunks:
+        if finished:
+            continue
+        
+        for char in chunk:
+            if in_string:
+                current.append(char)
+                if escaped:
+                    escaped = False
+                elif char == '\\':
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+                    if depth == 1:
+                        yield orjson.loads('"' + "".join(current))
+            elif char == '[':
+                depth += 1
+            elif char == ']' and depth > 0:
+                depth -= 1
+                if depth == 0:
+                    finished = True
+                    break
+            elif char == '"' and depth > 0:
+                in_string = True
+                current = []
+
+
+def _sweep_expired_cache_files(cache_dir, ttl):
+    """
+    Delete files in cache_dir older than ttl seconds, including abandoned temp files
+    
+    Runs at most once per CACHE_SWEEP_INTERVAL_SECONDS for each directory in this process,
+    so entries that are never read again don't pile up on disk.
+    """
+    now = time.time()
+    with _cache_sweep_lock:
+        if now - _cache_last_swept.get(cache_dir, 0) < CACHE_SWEEP_INTERVAL_SECONDS:
+            return
+        _cache_last_swept[cache_dir] = now
+    
+    try:
+        entries = list(os.scandir(cache_dir))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime >= ttl:
+                os.unlink(entry.path)
+        except OSError:
+            continue
+
+
+def _gemini_cache_path(image_bytes):
+    """Path of the cached Gemini response for an image under the current model and prompts"""
+    image_key = hashlib.blake2b(image_bytes, digest_size=16).hexdigest()
+    key = hashlib.blake2b(
+        f"{GEMINI_MODEL}|{GEMINI_PROMPT_VERSION}|{image_key}".encode("utf-8"), digest_size=16
+    ).hexdigest()
+    return os.path.join(GEMINI_CACHE_DIR, f"{key}.txt")
+
+
+def _get_cached_gemini_response(image_bytes):
+    """Return the cached Gemini response text for an image, or None on a miss or expired entry"""
+    cache_path = _gemini_cache_path(image_bytes)
+    try:
+        if time.time() - os.path.getmtime(cache_path) >= GEMINI_CACHE_TTL_SECONDS:
+            os.unlink(cache_path)
+            return None
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _cache_gemini_response(image_bytes, response_text):
+    """Store a Gemini response text for an image on disk"""
+    try:
+        os.makedirs(GEMINI_CACHE_DIR, exist_ok=True)
+        cache_path = _gemini_cache_path(image_bytes)
+        # Write to a temp file and swap it in so readers never see a partial entry
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(response_text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Failed to write Gemini cache entry - {e}")
+    
+    _sweep_expired_cache_files(GEMINI_CACHE_DIR, GEMINI_CACHE_TTL_SECONDS)
+
+
+def create_search_query_gemini(image_path=None, return_conversation=False, on_query=None, image_bytes=None):
+    """
+    Create search query for each clothing item in the image
+    
+    Parameters:
+    - image_path: Path to the image file
+    - image_bytes: Contents of the image file, used instead of reading image_path
+    - return_conversation: If True, returns both queries and conversation context
+    - on_query: Optional callback invoked with each search query as soon as it has streamed
+      in from Gemini, before the full response is complete
+    
+    Responses are cached per image for GEMINI_CACHE_TTL_SECONDS; a cached response is
+    replayed without calling Gemini.
+    
+    Returns:
+    - If return_conversation=False: List of search queries or error dict
+    - If return_conversation=True: Dict with 'queries', 'conversation_history', 'image_bytes', and 'system_prompt'
+    """
+    if not image_path and not image_bytes:
+        return {"error": "No image provided"}
+    
+    try:
+        # Read the image file, downscaled for upload
+        image_bytes = load_image_for_gemini(image_path, image_bytes)
         
         # Initial conversation content
-        initial_content = {
-            "role": "user", 
-            "parts": [
-                types.Part.from_bytes(data=image_bytes, mime_type='image/jpeg'),
-                {"text": user_prompt}
-            ]
-        }
+        initial_content = build_image_message(image_bytes, GEMINI_USER_PROMPT)
         
         # Create a JSON-serializable version for conversation history
         initial_content_serializable = {
             "role": "user", 
             "parts": [
                 {"text": "[IMAGE_DATA]"},  # Placeholder for image data
-                {"text": user_prompt}
+                {"text": GEMINI_USER_PROMPT}
             ]
         }
         
+        cached_response = _get_cached_gemini_response(image_bytes)
+        
         # Generate response using the system_instruction in config
-        response = genai_client.models.generate_content(
-            model='gemini-2.5-flash-preview-05-20',
-            contents=[initial_content],
-            config=GenerateContentConfig(
-                system_instruction=system_prompt
+        if cached_response is not None:
+            response_text = cached_response
+            if on_query:
+                for query in iter_json_array_strings([response_text]):
+                    on_query(query)
+        elif on_query:
+            # Stream the response so each query can be handed off as soon as it is complete
+            response_chunks = []
+            
+            def stream_text():
+                for chunk in genai_client.models.generate_content_stream(
+                    model=GEMINI_MODEL,
+                    contents=[initial_content],
+                    config=GenerateContentConfig(
+                        system_instruction=GEMINI_SYSTEM_PROMPT,
+                        response_mime_type=GEMINI_JSON_MIME_TYPE,
+                        response_schema=GEMINI_QUERIES_SCHEMA
+                    )
+                ):
+                    text = chunk.text or ""
+                    response_chunks.append(text)
+                    yield text
+            
+            for query in iter_json_array_strings(stream_text()):
+                on_query(query)
+            
+            response_text = "".join(response_chunks).strip()
+        else:
+            response = genai_client.models.generate_content(
+                model=GEMINI_MODEL,
+                contents=[initial_content],
+                config=GenerateContentConfig(
+                    system_instruction=GEMINI_SYSTEM_PROMPT,
+                    response_mime_type=GEMINI_JSON_MIME_TYPE,
+                    response_schema=GEMINI_QUERIES_SCHEMA
+                )
             )
-        )
-        
-        response_text = response.text.strip()
+            
+            response_text = response.text.strip()
         
         # Build conversation history (using serializable version)
         conversation_history = [
@@ -143,21 +505,18 @@ EXAMPLE OUTPUTS:
         
         # Ensure the response is valid JSON
         try:
-            # Find JSON array in the response if it's not pure JSON
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(0)
+            items = parse_json_array_response(response_text)
             
-            # Parse the JSON
-            items = json.loads(response_text)
+            if cached_response is None:
+                _cache_gemini_response(image_bytes, response_text)
             
             if return_conversation:
                 return {
                     "queries": items,
                     "conversation_history": conversation_history,
                     "image_bytes": image_bytes,
-                    "system_prompt": system_prompt,
-                    "model": 'gemini-2.5-flash-preview-05-20'
+                    "system_prompt": GEMINI_SYSTEM_PROMPT,
+                    "model": GEMINI_MODEL
                 }
             else:
                 return items
@@ -171,8 +530,8 @@ EXAMPLE OUTPUTS:
                     "queries": error_result,
                     "conversation_history": conversation_history,
                     "image_bytes": image_bytes,
-                    "system_prompt": system_prompt,
-                    "model": 'gemini-2.5-flash-preview-05-20'
+                    "system_prompt": GEMINI_SYSTEM_PROMPT,
+                    "model": GEMINI_MODEL
                 }
             else:
                 return error_result
@@ -186,13 +545,20 @@ EXAMPLE OUTPUTS:
                 "queries": error_result,
                 "conversation_history": [],
                 "image_bytes": None,
-                "system_prompt": system_prompt if 'system_prompt' in locals() else None,
-                "model": 'gemini-2.5-flash-preview-05-20'
+                "system_prompt": GEMINI_SYSTEM_PROMPT,
+                "model": GEMINI_MODEL
             }
         else:
             return error_result
 
 
+def trim_conversation_history(conversation, max_turns=GEMINI_REDO_MAX_TURNS):
+    """Keep the initial image message and reply plus the last max_turns user/model rounds"""
+    if len(conversation) <= 2 + 2 * max_turns:
+        return conversation
+    return conversation[:2] + conversation[-2 * max_turns:]
+
+
 def redo_search_queries(conversation_context, feedback_message=None):
     """
     Continue the conversation with Gemini to redo the search queries
@@ -228,58 +594,49 @@ Please provide new search queries in the same JSON array format. Make sure to in
             "parts": [{"text": feedback_message}]
         }
         
-        # Update conversation history
-        updated_conversation = conversation_context["conversation_history"] + [feedback_content]
+        # Update conversation history, dropping the oldest redo rounds so the request stays bounded
+        updated_conversation = trim_conversation_history(conversation_context["conversation_history"]) + [feedback_content]
         
-        # For the actual API call, we need to reconstruct the conversation with the real image data
-        api_conversation = []
-        for msg in updated_conversation:
-            if msg["role"] == "user" and any("[IMAGE_DATA]" in str(part) for part in msg["parts"]):
-                # Replace the placeholder with actual image data for the first user message
-                api_msg = {
-                    "role": "user",
-                    "parts": [
-                        types.Part.from_bytes(data=conversation_context["image_bytes"], mime_type='image/jpeg'),
-                        {"text": msg["parts"][1]["text"]}  # The actual text prompt
-                    ]
-                }
-                api_conversation.append(api_msg)
-            else:
-                api_conversation.append(msg)
+        # Contexts rebuilt by the API carry the original upload from storage, so the image is
+        # downscaled here like in create_search_query_gemini
+        image_bytes = load_image_for_gemini(image_bytes=conversation_context["image_bytes"])
+        
+        # For the actual API call, swap the image placeholder in the first user message
+        # for the real image data; the rest of the history is passed through as-is
+        initial_message = updated_conversation[0]
+        api_conversation = [
+            build_image_message(image_bytes, initial_message["parts"][1]["text"])
+        ] + updated_conversation[1:]
         
         # Generate new response
         response = genai_client.models.generate_content(
             model=conversation_context["model"],
             contents=api_conversation,
             config=GenerateContentConfig(
-                system_instruction=conversation_context["system_prompt"]
+                system_instruction=conversation_context["system_prompt"],
+                response_mime_type=GEMINI_JSON_MIME_TYPE,
+                response_schema=GEMINI_QUERIES_SCHEMA
             )
         )
         
         response_text = response.text.strip()
         
         # Add model response to conversation history
-        final_conversation = updated_conversation + [
+        final_conversation = trim_conversation_history(updated_conversation + [
             {
                 "role": "model", 
                 "parts": [{"text": response_text}]
             }
-        ]
+        ])
         
         # Parse the new response
         try:
-            # Find JSON array in the response if it's not pure JSON
-            json_match = re.search(r'\[.*\]', response_text, re.DOTALL)
-            if json_match:
-                response_text = json_match.group(0)
-            
-            # Parse the JSON
-            new_queries = json.loads(response_text)
+            new_queries = parse_json_array_response(response_text)
             
             return {
                 "queries": new_queries,
                 "conversation_history": final_conversation,
-                "image_bytes": conversation_context["image_bytes"],
+                "image_bytes": image_bytes,
                 "system_prompt": conversation_context["system_prompt"],
                 "model": conversation_context["model"],
                 "feedback_used": feedback_message
@@ -290,7 +647,7 @@ Please provide new search queries in the same JSON array format. Make sure to in
                 "error": "Failed to parse JSON from redo response", 
                 "raw_response": response_text,
                 "conversation_history": final_conversation,
-                "image_bytes": conversation_context["image_bytes"],
+                "image_bytes": image_bytes,
                 "system_prompt": conversation_context["system_prompt"],
                 "model": conversation_context["model"]
             }
@@ -299,7 +656,116 @@ Please provide new search queries in the same JSON array format. Make sure to in
         return {"error": f"Error in redo_search_queries: {str(e)}"}
 
 
-def search_shopping_item(query, country="us", language="en"):
+def _serp_cache_key(engine, query, country, language):
+    """Build the cache key for a SerpAPI search"""
+    return hashlib.blake2b(f"{engine}|{query}|{country}|{language}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _remember_serp_result(key, payload, cached_at):
+    """Store serialized results in the in-memory LRU, evicting the oldest entries"""
+    with _serp_memory_cache_lock:
+        _serp_memory_cache[key] = (cached_at, payload)
+        _serp_memory_cache.move_to_end(key)
+        while len(_serp_memory_cache) > SERP_MEMORY_CACHE_SIZE:
+            _serp_memory_cache.popitem(last=False)
+
+
+def _get_cached_serp_result(key):
+    """
+    Look up a cached SerpAPI response, checking memory first and then disk
+    
+    Returns:
+    - A fresh copy of the cached results dictionary, or None on a miss or expired entry
+    """
+    now = time.time()
+    
+    with _serp_memory_cache_lock:
+        entry = _serp_memory_cache.get(key)
+        if entry is not None:
+            cached_at, payload = entry
+            if now - cached_at < SERP_CACHE_TTL_SECONDS:
+                _serp_memory_cache.move_to_end(key)
+                return orjson.loads(payload)
+            del _serp_memory_cache[key]
+    
+    cache_path = os.path.join(SERP_CACHE_DIR, f"{key}.json")
+    try:
+        cached_at = os.path.getmtime(cache_path)
+        if now - cached_at >= SERP_CACHE_TTL_SECONDS:
+            os.unlink(cache_path)
+            return None
+        with open(cache_path, 'rb') as f:
+            payload = f.read()
+        results = orjson.loads(payload)
+    except (OSError, orjson.JSONDecodeError):
+        return None
+    
+    _remember_serp_result(key, payload, cached_at)
+    return results
+
+
+def _cache_serp_result(key, results):
+    """Store a successful SerpAPI response in memory and on disk"""
+    payload = orjson.dumps(results)
+    _remember_serp_result(key, payload, time.time())
+    
+    try:
+        os.makedirs(SERP_CACHE_DIR, exist_ok=True)
+        cache_path = os.path.join(SERP_CACHE_DIR, f"{key}.json")
+        # Write to a temp file and swap it in so readers never see a partial entry
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Failed to write SerpAPI cache entry - {e}")
+    
+    _sweep_expired_cache_files(SERP_CACHE_DIR, SERP_CACHE_TTL_SECONDS)
+
+
+def serp_base_params(country="us", language="en"):
+    """Build the SerpAPI Google Shopping params shared by every query in a batch"""
+    return {
+        "engine": "google_shopping",
+        "api_key": SERPAPI_KEY,
+        "gl": country,
+        "hl": language,
+        #"direct_link": "true"
+    }
+
+
+def _serp_retry_wait(response, attempt):
+    """Seconds to wait before retrying a throttled or failed SerpAPI response"""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return int(retry_after)
+    return SERPAPI_RETRY_BACKOFF_FACTOR * (2 ** attempt)
+
+
+def _get_serp_response(params):
+    """
+    Send a SerpAPI request, retrying throttled (429) and failed (5xx) responses
+    
+    Each attempt takes its own rate-limiter token and concurrency slot, so backoff sleeps
+    don't hold a slot. Retries stop once the next one could not start before
+    SERPAPI_SEARCH_DEADLINE_SECONDS, and the last response is returned.
+    """
+    deadline = time.monotonic() + SERPAPI_SEARCH_DEADLINE_SECONDS
+    for attempt in range(SERPAPI_MAX_RETRIES + 1):
+        _SERP_RATE_LIMITER.acquire()
+        with _SERP_SEMAPHORE:
+            response = _SERP_SESSION.get(SERPAPI_SEARCH_URL, params=params, timeout=SERPAPI_REQUEST_TIMEOUT)
+        
+        if response.status_code not in SERPAPI_RETRY_STATUSES or attempt == SERPAPI_MAX_RETRIES:
+            return response
+        
+        wait = _serp_retry_wait(response, attempt)
+        if time.monotonic() + wait >= deadline:
+            return response
+        time.sleep(wait)
+
+
+def search_shopping_item(query, country="us", language="en", ignore_cache=False, base_params=None):
     """
     Search for a clothing item using SerpAPI's Google Shopping API
     
@@ -307,6 +773,12 @@ def search_shopping_item(query, country="us", language="en"):
     - query: The search query string
     - country: Two-letter country code (default: "us")
     - language: Language code (default: "en")
+    - ignore_cache: Always query SerpAPI, refreshing the cached response (default: False)
+    - base_params: Shared params from serp_base_params(country, language), so batches
+      build them once instead of per query (default: built here)
+    
+    Identical searches are served from the SerpAPI response cache for
+    SERP_CACHE_TTL_SECONDS; only successful responses are cached.
     
     Returns:
     - Dictionary containing search results
@@ -314,23 +786,27 @@ def search_shopping_item(query, country="us", language="en"):
     if not SERPAPI_KEY:
         return {"error": "SERPAPI_API_KEY not set in environment variables"}
     
-    params = {
-        "engine": "google_shopping",
-        "q": query,
-        "api_key": SERPAPI_KEY,
-        "gl": country,
-        "hl": language,
-        #"direct_link": "true"
-    }
+    if base_params is None:
+        base_params = serp_base_params(country, language)
+    
+    cache_key = _serp_cache_key(base_params["engine"], query, country, language)
+    if not ignore_cache:
+        cached_results = _get_cached_serp_result(cache_key)
+        if cached_results is not None:
+            return cached_results
     
+    params = {**base_params, "q": query}
     
     try:
-        search = SerpAPISearch(params)
-        results = search.get_dict()
+        response = _get_serp_response(params)
+        results = response.json()
         
         # Add query metadata to results
         results["original_query"] = query
         
+        if "error" not in results:
+            _cache_serp_result(cache_key, results)
+        
         return results
     except Exception as e:
         return {
@@ -339,47 +815,202 @@ def search_shopping_item(query, country="us", language="en"):
         }
 
 
-def search_items_parallel(queries, country="us", language="en", max_workers=5):
+def clean_search_queries(queries):
+    """Strip search queries and drop blank or non-string entries, which would only waste a SerpAPI call"""
+    return [query.strip() for query in queries if isinstance(query, str) and query.strip()]
+
+
+def normalize_query(query):
+    """Reduce a search query to its sorted lowercase word tokens, so reworded duplicates compare equal"""
+    return " ".join(sorted(_QUERY_TOKEN_RE.findall(query.lower())))
+
+
+def expand_duplicate_query_results(results, queries):
+    """
+    Give every query its own result when duplicate queries were searched only once
+    
+    Parameters:
+    - results: List of search results, one per distinct normalized query
+    - queries: Full list of queries, including duplicates
+    
+    Returns:
+    - List of search results with one entry per query
+    """
+    queries_by_key = {}
+    for query in queries:
+        queries_by_key.setdefault(normalize_query(query), []).append(query)
+    
+    expanded_results = []
+    for result in results:
+        searched_query = result["original_query"]
+        for index, query in enumerate(queries_by_key.get(normalize_query(searched_query), [searched_query])):
+            if index == 0 and query == searched_query:
+                expanded_results.append(result)
+            else:
+                expanded_results.append(dict(result, original_query=query))
+    
+    return expanded_results
+
+
+def search_items_parallel(queries, country="us", language="en", max_workers=None, ignore_cache=False):
     """
     Search for multiple clothing items in parallel
     
+    Queries that only differ in word order, case or punctuation are searched once
+    and the result is shared between them.
+    
     Parameters:
     - queries: List of search query strings
     - country: Two-letter country code (default: "us")
     - language: Language code (default: "en")
-    - max_workers: Maximum number of parallel workers (default: 5)
+    - max_workers: Run the searches on a dedicated pool of this many workers instead of
+      the shared search pool (default: None, use the shared pool)
+    - ignore_cache: Skip the SerpAPI response cache and fetch fresh results (default: False)
     
     Returns:
     - List of dictionaries containing search results
     """
     results = []
     
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+    if not queries:
+        return results
+    
+    # Keep the first wording of each distinct query
+    unique_queries = {}
+    for query in queries:
+        unique_queries.setdefault(normalize_query(query), query)
+    
+    if max_workers is None:
+        executor = _SERP_SEARCH_EXECUTOR
+    else:
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=min(len(unique_queries), max_workers))
+    base_params = serp_base_params(country, language)
+    try:
         # Create a list of futures
         future_to_query = {
             executor.submit(
                 search_shopping_item, 
                 query, 
                 country, 
-                language
-            ): query for query in queries
+                language,
+                ignore_cache,
+                base_params
+            ): query for query in unique_queries.values()
         }
         
-        # Process results as they complete
-        for future in concurrent.futures.as_completed(future_to_query):
+        results = collect_search_results(future_to_query)
+    finally:
+        if executor is not _SERP_SEARCH_EXECUTOR:
+            # Don't block on searches abandoned at the deadline
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    if len(unique_queries) < len(queries):
+        results = expand_duplicate_query_results(results, queries)
+    
+    return results
+
+
+def collect_search_results(future_to_query, timeout=None):
+    """
+    Collect search results from submitted search_shopping_item futures
+    
+    Parameters:
+    - future_to_query: Dict mapping each future to the query it is searching
+    - timeout: Seconds to wait for all searches before giving up on the rest
+      (default: SERPAPI_SEARCH_DEADLINE_SECONDS)
+    
+    Returns:
+    - List of dictionaries containing search results, in completion order, with
+      an error entry for every search that did not finish before the deadline
+    """
+    if timeout is None:
+        timeout = SERPAPI_SEARCH_DEADLINE_SECONDS
+    
+    results = []
+    pending = set(future_to_query)
+    
+    # Process results as they complete
+    try:
+        for future in concurrent.futures.as_completed(future_to_query, timeout=timeout):
+            pending.discard(future)
             query = future_to_query[future]
             try:
                 result = future.result()
+                result.setdefault("original_query", query)
                 results.append(result)
             except Exception as e:
                 results.append({
                     "error": f"Error processing query '{query}': {str(e)}",
                     "original_query": query
                 })
+    except concurrent.futures.TimeoutError:
+        for future in pending:
+            future.cancel()
+            query = future_to_query[future]
+            print(f"Warning: Search for '{query}' did not finish within {timeout} seconds")
+            results.append({
+                "error": f"Search timed out after {timeout} seconds",
+                "original_query": query
+            })
     
     return results
 
 
+# Product fields copied from each SerpAPI shopping result into the CSV rows
+_PRODUCT_FIELDS = (
+    "title", "link", "price", "extracted_price", "source", "rating",
+    "reviews", "thumbnail", "product_id", "shipping", "tag"
+)
+
+# Empty product columns for rows that record a failed or empty search
+_NULL_PRODUCT = {
+    "title": None,
+    "link": None,
+    "price": None,
+    "extracted_price": None,
+    "source": None,
+    "rating": None,
+    "reviews": None,
+    "thumbnail": None,
+    "product_id": None
+}
+
+# Shopping result fields read by process_shopping_results and clean_single_product
+_SHOPPING_RESULT_FIELDS = frozenset(_PRODUCT_FIELDS) | {
+    "product_link", "old_price", "extracted_old_price", "source_icon", "position",
+    "delivery", "extensions", "thumbnails", "serpapi_thumbnails"
+}
+
+# Column layout of the shopping results CSV
+_CSV_COLUMNS = ("query", "error") + _PRODUCT_FIELDS
+
+
+def slim_search_result(result):
+    """
+    Reduce a raw SerpAPI response to the fields used when processing and cleaning results
+    
+    Parameters:
+    - result: Raw search result dictionary from search_shopping_item
+    
+    Returns:
+    - Dictionary with the query, any error, and the kept fields of each shopping result
+    """
+    slim_result = {key: result[key] for key in ("original_query", "error") if key in result}
+    
+    shopping_results = result.get("shopping_results")
+    if isinstance(shopping_results, list):
+        slim_result["shopping_results"] = [
+            # Products with none of the kept fields are passed through unchanged
+            ({key: value for key, value in item.items() if key in _SHOPPING_RESULT_FIELDS} or item)
+            if isinstance(item, dict) else item
+            for item in shopping_results
+        ]
+    elif shopping_results is not None:
+        slim_result["shopping_results"] = shopping_results
+    
+    return slim_result
+
+
 def process_shopping_results(results):
     """
     Process and flatten the shopping results for easier CSV storage
@@ -397,100 +1028,127 @@ def process_shopping_results(results):
         
         # Handle error cases
         if "error" in result:
-            processed_items.append({
-                "query": original_query,
-                "error": result["error"],
-                "title": None,
-                "link": None,
-                "price": None,
-                "extracted_price": None,
-                "source": None,
-                "rating": None,
-                "reviews": None,
-                "thumbnail": None,
-                "product_id": None
-            })
+            processed_items.append({"query": original_query, "error": result["error"], **_NULL_PRODUCT})
             continue
         
         # Process shopping results
         shopping_results = result.get("shopping_results", [])
         if not shopping_results:
-            processed_items.append({
-                "query": original_query,
-                "error": "No shopping results found",
-                "title": None,
-                "link": None,
-                "price": None,
-                "extracted_price": None,
-                "source": None,
-                "rating": None,
-                "reviews": None,
-                "thumbnail": None,
-                "product_id": None
-            })
+            processed_items.append({"query": original_query, "error": "No shopping results found", **_NULL_PRODUCT})
             continue
         
-        # Process each item in shopping results
-        for item in shopping_results:
-            processed_item = {
-                "query": original_query,
-                "title": item.get("title"),
-                "link": item.get("link"),
-                "price": item.get("price"),
-                "extracted_price": item.get("extracted_price"),
-                "source": item.get("source"),
-                "rating": item.get("rating"),
-                "reviews": item.get("reviews"),
-                "thumbnail": item.get("thumbnail"),
-                "product_id": item.get("product_id"),
-                "shipping": item.get("shipping"),
-                "tag": item.get("tag")
-            }
-            processed_items.append(processed_item)
+        # Flatten each item in shopping results
+        processed_items.extend(
+            {"query": original_query, **{field: item.get(field) for field in _PRODUCT_FIELDS}}
+            for item in shopping_results
+        )
     
     return processed_items
 
 
-def save_raw_results_to_json(search_results, output_path=None):
+def transform_search_results(results):
     """
-    Save complete raw SerpAPI search results to a JSON file
+    Build the CSV rows and the cleaned frontend data for search results in a single pass
     
     Parameters:
-    - search_results: List of raw search result dictionaries from search_items_parallel
-    - output_path: Path to save the JSON file (default: generates timestamped filename)
+    - results: List of dictionaries from search_items_parallel
     
     Returns:
-    - Path to the saved JSON file
+    - Tuple of (rows as returned by process_shopping_results,
+      cleaned data as returned by clean_search_results_for_frontend)
+    """
+    processed_items = []
+    cleaned_items = []
+    error_items = []
+    total_products = 0
+    
+    for result in results:
+        original_query = result.get("original_query", "Unknown query")
+        
+        # Handle error cases
+        if "error" in result:
+            processed_items.append({"query": original_query, "error": result["error"], **_NULL_PRODUCT})
+            error_items.append({"query": original_query, "error": result["error"]})
+            continue
+        
+        shopping_results = result.get("shopping_results", [])
+        if not shopping_results:
+            processed_items.append({"query": original_query, "error": "No shopping results found", **_NULL_PRODUCT})
+            error_items.append({"query": original_query, "error": "No shopping results found"})
+            continue
+        
+        processed_items.extend(
+            {"query": original_query, **{field: item.get(field) for field in _PRODUCT_FIELDS}}
+            for item in shopping_results
+        )
+        
+        clothing_item = _clean_clothing_item(original_query, shopping_results)
+        cleaned_items.append(clothing_item)
+        total_products += clothing_item["total_products"]
+    
+    cleaned_data = {
+        "clothing_items": cleaned_items,
+        "summary": {
+            "total_items": len(cleaned_items),
+            "total_products": total_products,
+            "has_errors": len(error_items) > 0,
+            "error_items": error_items
+        }
+    }
+    return processed_items, cleaned_data
+
+
+def save_raw_results_to_json(search_results, output_path=None, timestamp=None):
+    """
+    Save complete raw SerpAPI search results to a gzip-compressed JSON Lines file
+    
+    Results are streamed to disk one at a time, one raw response per line, so
+    only a single serialized response is held in memory while writing. Readers
+    should iterate the lines of gzip.open(path) and parse each one separately.
+    
+    Parameters:
+    - search_results: List (or any iterable) of raw search result dictionaries from search_items_parallel
+    - output_path: Path to save the .jsonl.gz file (default: generates timestamped filename)
+    - timestamp: Timestamp suffix for the generated filename (default: current time)
+    
+    Returns:
+    - Path to the saved .jsonl.gz file
     """
     if not search_results:
         return {"error": "No search results to save"}
     
     # Generate output path if not provided
     if not output_path:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = f"raw_search_results_{timestamp}.json"
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_path = f"raw_search_results_{timestamp}.jsonl.gz"
     
     # Ensure directory exists
     output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    # Save to JSON with proper formatting
+    # Stream each result as its own line; a low compression level keeps the CPU cost small
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(search_results, f, indent=2, ensure_ascii=False)
+        with gzip.open(output_path, 'wb', compresslevel=3) as gz:
+            for result in search_results:
+                gz.write(orjson.dumps(result))
+                gz.write(b"\n")
         return output_path
     except Exception as e:
         return {"error": f"Failed to save raw results: {str(e)}"}
 
 
-def save_results_to_csv(processed_items, output_path=None):
+def save_results_to_csv(processed_items, output_path=None, timestamp=None):
     """
     Save processed shopping results to a CSV file
     
     Parameters:
     - processed_items: List of dictionaries from process_shopping_results
     - output_path: Path to save the CSV file (default: generates timestamped filename)
+    - timestamp: Timestamp suffix for the generated filename (default: current time)
+    
+    Values are written as they appear in the rows, so integer fields such as reviews and
+    whole-number prices are written without a decimal point (e.g. 123, not 123.0).
     
     Returns:
     - Path to the saved CSV file
@@ -498,28 +1156,28 @@ def save_results_to_csv(processed_items, output_path=None):
     if not processed_items:
         return {"error": "No items to save"}
     
-    # Create DataFrame from processed items
-    df = pd.DataFrame(processed_items)
-    
     # Generate output path if not provided
     if not output_path:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = f"shopping_results_{timestamp}.csv"
     
     # Ensure directory exists
     output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    # Save to CSV
+    # Stream the rows straight to CSV with a fixed column layout
     try:
-        df.to_csv(output_path, index=False)
+        with open(output_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=_CSV_COLUMNS, extrasaction='ignore', lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(processed_items)
         return output_path
     except Exception as e:
         return {"error": f"Failed to save CSV results: {str(e)}"}
 
 
-def outfit_recommendation_with_redo(image_path, country="us", language="en", output_path=None, enable_redo=False, save_raw_json=True):
+def outfit_recommendation_with_redo(image_path, country="us", language="en", output_path=None, enable_redo=False, save_raw_json=True, clean_for_frontend=False):
     """
     Enhanced version of outfit_recommendation that optionally returns conversation context for redo functionality
     
@@ -529,74 +1187,143 @@ def outfit_recommendation_with_redo(image_path, country="us", language="en", out
     - language: Language code (default: "en")
     - output_path: Path to save the CSV file (default: generates timestamped filename)
     - enable_redo: If True, returns conversation context for potential redo
-    - save_raw_json: If True, saves complete raw SerpAPI responses as JSON
+    - save_raw_json: If True, saves complete raw SerpAPI responses as gzipped JSON Lines
+    - clean_for_frontend: If True, also returns the cleaned frontend data as "cleaned_data"
     
     Returns:
     - Dictionary containing results and optionally conversation context for redo
     """
-    # Step 1: Get search queries from image using Gemini
+    # Step 1: Get search queries from image using Gemini. The response is streamed and
+    # the search for each clothing item (Step 2) starts as soon as its query arrives
     print(f"Analyzing image: {image_path}")
     
-    if enable_redo:
-        query_result = create_search_query_gemini(image_path, return_conversation=True)
-        search_queries = query_result.get("queries", [])
-        conversation_context = query_result
-    else:
-        search_queries = create_search_query_gemini(image_path)
-        conversation_context = None
+    future_to_query = {}
+    searched_keys = set()
+    base_params = serp_base_params(country, language)
+    
+    def start_search(query):
+        query = query.strip()
+        if not query:
+            return
+        # Duplicate queries share a single search
+        key = normalize_query(query)
+        if key in searched_keys:
+            return
+        searched_keys.add(key)
+        future = _SERP_SEARCH_EXECUTOR.submit(search_shopping_item, query, country, language, base_params=base_params)
+        future_to_query[future] = query
     
-    if isinstance(search_queries, dict) and "error" in search_queries:
-        result = search_queries
-        if enable_redo and conversation_context:
-            result["conversation_context"] = conversation_context
-        return result
+    try:
+        if enable_redo:
+            query_result = create_search_query_gemini(image_path, return_conversation=True, on_query=start_search)
+            search_queries = query_result.get("queries", [])
+            conversation_context = query_result
+        else:
+            search_queries = create_search_query_gemini(image_path, on_query=start_search)
+            conversation_context = None
+        
+        if isinstance(search_queries, dict) and "error" in search_queries:
+            result = search_queries
+            if enable_redo and conversation_context:
+                result["conversation_context"] = conversation_context
+            return result
+        
+        search_queries = clean_search_queries(search_queries)
+        if not search_queries:
+            result = {"error": "No clothing items identified in the image"}
+            if enable_redo and conversation_context:
+                result["conversation_context"] = conversation_context
+            return result
+        
+        print(f"Identified {len(search_queries)} clothing items")
+        for i, query in enumerate(search_queries):
+            print(f"  Item {i+1}: {query}")
+        
+        # Step 2: Reconcile the streamed searches with the final parsed queries. Searches for
+        # queries missing from the final list are dropped, and any query that did not stream
+        # in (e.g. when the array had to be recovered from surrounding text) is searched now
+        print(f"Searching for {len(search_queries)} items...")
+        final_keys = {normalize_query(query) for query in search_queries}
+        for future, query in list(future_to_query.items()):
+            key = normalize_query(query)
+            if key not in final_keys:
+                future.cancel()
+                del future_to_query[future]
+                searched_keys.discard(key)
+        
+        for query in search_queries:
+            start_search(query)
+        
+        search_results = expand_duplicate_query_results(collect_search_results(future_to_query), search_queries)
+    finally:
+        # Drop streamed searches that haven't started when returning early
+        for future in future_to_query:
+            future.cancel()
     
-    if not search_queries or len(search_queries) == 0:
-        result = {"error": "No clothing items identified in the image"}
-        if enable_redo and conversation_context:
-            result["conversation_context"] = conversation_context
-        return result
+    # Steps 3-5: Save and summarize the results
+    result = save_and_summarize_search_results(search_queries, search_results, output_path, save_raw_json, clean_for_frontend)
     
-    print(f"Identified {len(search_queries)} clothing items")
-    for i, query in enumerate(search_queries):
-        print(f"  Item {i+1}: {query}")
+    if enable_redo and conversation_context:
+        result["conversation_context"] = conversation_context
     
-    # Step 2: Search for each clothing item in parallel
-    print(f"Searching for {len(search_queries)} items...")
-    search_results = search_items_parallel(
-        search_queries,
-        country=country,
-        language=language
-    )
+    return result
+
+
+def save_and_summarize_search_results(search_queries, search_results, output_path=None, save_raw_json=True, clean_for_frontend=False):
+    """
+    Save raw and processed search results and build the outfit result summary
     
-    # Step 3: Save raw search results if requested
-    raw_json_path = None
+    Parameters:
+    - search_queries: List of search queries that were searched
+    - search_results: List of raw search result dictionaries from search_items_parallel
+    - output_path: Path to save the CSV file (default: generates timestamped filename)
+    - save_raw_json: If True, saves complete raw SerpAPI responses as gzipped JSON Lines
+    - clean_for_frontend: If True, also builds the cleaned frontend data ("cleaned_data")
+      in the same pass over the results
+    
+    Returns:
+    - Dictionary containing the results summary, or an error dict if saving the CSV failed
+    """
+    # Raw JSON and CSV files generated for the same search share a timestamp suffix
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    
+    # Step 3: Save raw search results in the background if requested
+    raw_json_future = None
     if save_raw_json:
         print("Saving raw search results...")
         if output_path:
             # Generate JSON path based on CSV path
             base_path = os.path.splitext(output_path)[0]
-            raw_json_path = f"{base_path}_raw.json"
+            raw_json_path = f"{base_path}_raw.jsonl.gz"
         else:
             raw_json_path = None
         
-        raw_json_result = save_raw_results_to_json(search_results, raw_json_path)
+        raw_json_future = _RESULTS_IO_EXECUTOR.submit(save_raw_results_to_json, search_results, raw_json_path, timestamp)
+    
+    # Only the fields used from here on are kept; the full responses go to the raw JSON
+    search_results = [slim_search_result(result) for result in search_results]
+    
+    # Step 4: Process the results for CSV storage while the raw JSON is written
+    cleaned_data = None
+    if clean_for_frontend:
+        processed_results, cleaned_data = transform_search_results(search_results)
+    else:
+        processed_results = process_shopping_results(search_results)
+    
+    # Step 5: Save processed results to CSV
+    csv_result = save_results_to_csv(processed_results, output_path, timestamp)
+    
+    raw_json_path = None
+    if raw_json_future:
+        raw_json_result = raw_json_future.result()
         if isinstance(raw_json_result, dict) and "error" in raw_json_result:
             print(f"Warning: Failed to save raw results - {raw_json_result['error']}")
-            raw_json_path = None
         else:
             raw_json_path = raw_json_result
             print(f"Raw search results saved to: {raw_json_path}")
     
-    # Step 4: Process the results for CSV storage
-    processed_results = process_shopping_results(search_results)
-    
-    # Step 5: Save processed results to CSV
-    csv_result = save_results_to_csv(processed_results, output_path)
     if isinstance(csv_result, dict) and "error" in csv_result:
         result = csv_result
-        if enable_redo and conversation_context:
-            result["conversation_context"] = conversation_context
         if raw_json_path:
             result["raw_results_saved_to"] = raw_json_path
         return result
@@ -613,13 +1340,13 @@ def outfit_recommendation_with_redo(image_path, country="us", language="en", out
         "results_data": processed_results
     }
     
+    if cleaned_data is not None:
+        result["cleaned_data"] = cleaned_data
+    
     if raw_json_path:
         result["raw_results_saved_to"] = raw_json_path
         result["raw_results_data"] = search_results
     
-    if enable_redo and conversation_context:
-        result["conversation_context"] = conversation_context
-    
     return result
 
 
@@ -633,7 +1360,7 @@ def outfit_recommendation(image_path, country="us", language="en", output_path=N
     - country: Two-letter country code (default: "us")
     - language: Language code (default: "en")
     - output_path: Path to save the CSV file (default: generates timestamped filename)
-    - save_raw_json: If True, saves complete raw SerpAPI responses as JSON
+    - save_raw_json: If True, saves complete raw SerpAPI responses as gzipped JSON Lines
     
     Returns:
     - Dictionary containing results summary and path to the saved CSV file
@@ -719,9 +1446,6 @@ def clean_search_results_for_frontend(raw_search_results):
     for result in raw_search_results:
         original_query = result.get("original_query", "Unknown query")
         
-        # Extract item type from query (first word after gender if present)
-        item_type = extract_item_type_from_query(original_query)
-        
         # Handle error cases
         if "error" in result:
             error_items.append({
@@ -739,31 +1463,9 @@ def clean_search_results_for_frontend(raw_search_results):
             })
             continue
         
-        # Clean each product
-        cleaned_products = []
-        prices = []
-        
-        for product in shopping_results:
-            cleaned_product = clean_single_product(product)
-            if cleaned_product:
-                cleaned_products.append(cleaned_product)
-                if cleaned_product["price_numeric"]:
-                    prices.append(cleaned_product["price_numeric"])
-        
-        # Calculate price range
-        price_range = calculate_price_range(prices) if prices else None
-        
-        # Create clothing item entry
-        clothing_item = {
-            "query": original_query,
-            "item_type": item_type,
-            "products": cleaned_products,
-            "total_products": len(cleaned_products),
-            "price_range": price_range
-        }
-        
+        clothing_item = _clean_clothing_item(original_query, shopping_results)
         cleaned_items.append(clothing_item)
-        total_products += len(cleaned_products)
+        total_products += clothing_item["total_products"]
     
     return {
         "clothing_items": cleaned_items,
@@ -775,6 +1477,274 @@ def clean_search_results_for_frontend(raw_search_results):
         }
     }
 
+
+def _clean_clothing_item(original_query, shopping_results):
+    """Build the cleaned frontend entry for one clothing item's shopping results"""
+    # Clean each product
+    cleaned_products = [p for p in map(clean_single_product, shopping_results) if p]
+    prices = [p["price_numeric"] for p in cleaned_products if p["price_numeric"]]
+    
+    return {
+        "query": original_query,
+        # Extract item type from query (first word after gender if present)
+        "item_type": extract_item_type_from_query(original_query),
+        "products": cleaned_products,
+        "total_products": len(cleaned_products),
+        "price_range": calculate_price_range(prices) if prices else None
+    }
+
+
+# Multi-word clothing patterns, checked in order (most specific first)
+_MULTI_WORD_PATTERNS = (
+    # Tops - specific patterns
+    ('tank top', 'tank_top'),
+    ('tube top', 'tube_top'),
+    ('crop top', 'crop_top'),
+    ('halter top', 'halter_top'),
+    ('mock neck', 'turtleneck'),
+    ('cowl neck', 'sweater'),
+    ('v-neck', 'shirt'),
+    ('crew neck', 'shirt'),
+    ('crewneck', 'shirt'),
+    
+    # Outerwear patterns
+    ('leather jacket', 'leather_jacket'),
+    ('denim jacket', 'denim_jacket'),
+    ('jean jacket', 'denim_jacket'),
+    ('bomber jacket', 'bomber_jacket'),
+    ('puffer jacket', 'puffer_jacket'),
+    ('down jacket', 'puffer_jacket'),
+    ('track jacket', 'track_jacket'),
+    ('varsity jacket', 'varsity_jacket'),
+    ('rain jacket', 'raincoat'),
+    ('trench coat', 'trench_coat'),
+    ('pea coat', 'peacoat'),
+    ('duffle coat', 'coat'),
+    
+    # Bottoms - specific patterns
+    ('cargo pants', 'cargo_pants'),
+    ('cargo shorts', 'cargo_shorts'),
+    ('yoga pants', 'yoga_pants'),
+    ('track pants', 'track_pants'),
+    ('sweat pants', 'sweatpants'),
+    ('palazzo pants', 'palazzo_pants'),
+    ('wide leg pants', 'wide_leg_pants'),
+    ('straight leg pants', 'pants'),
+    ('skinny jeans', 'skinny_jeans'),
+    ('slim jeans', 'jeans'),
+    ('boyfriend jeans', 'jeans'),
+    ('mom jeans', 'jeans'),
+    ('bootcut jeans', 'jeans'),
+    ('bermuda shorts', 'bermuda_shorts'),
+    ('board shorts', 'board_shorts'),
+    ('bike shorts', 'bike_shorts'),
+    ('cycling shorts', 'bike_shorts'),
+    ('running shorts', 'athletic_shorts'),
+    ('athletic shorts', 'athletic_shorts'),
+    ('denim shorts', 'denim_shorts'),
+    ('jean shorts', 'denim_shorts'),
+    
+    # Skirts - specific patterns
+    ('pencil skirt', 'pencil_skirt'),
+    ('a-line skirt', 'a_line_skirt'),
+    ('a line skirt', 'a_line_skirt'),
+    ('circle skirt', 'circle_skirt'),
+    ('pleated skirt', 'pleated_skirt'),
+    ('wrap skirt', 'wrap_skirt'),
+    ('mini skirt', 'mini_skirt'),
+    ('midi skirt', 'midi_skirt'),
+    ('maxi skirt', 'maxi_skirt'),
+    
+    # Dresses - specific patterns
+    ('cocktail dress', 'cocktail_dress'),
+    ('evening dress', 'evening_dress'),
+    ('ball gown', 'gown'),
+    ('sheath dress', 'sheath_dress'),
+    ('shift dress', 'shift_dress'),
+    ('wrap dress', 'wrap_dress'),
+    ('shirt dress', 'shirt_dress'),
+    ('sweater dress', 'sweater_dress'),
+    ('jumper dress', 'jumper_dress'),
+    ('slip dress', 'slip_dress'),
+    ('bodycon dress', 'bodycon_dress'),
+    ('fit and flare dress', 'fit_and_flare_dress'),
+    ('a-line dress', 'a_line_dress'),
+    ('a line dress', 'a_line_dress'),
+    ('maxi dress', 'maxi_dress'),
+    ('midi dress', 'midi_dress'),
+    ('mini dress', 'mini_dress'),
+    ('sun dress', 'sundress'),
+    
+    # Formal wear
+    ('dress shirt', 'dress_shirt'),
+    ('button down', 'button_down'),
+    ('button up', 'button_down'),
+    ('oxford shirt', 'oxford_shirt'),
+    ('polo shirt', 'polo'),
+    ('rugby shirt', 'rugby_shirt'),
+    
+    # Athletic wear
+    ('sports bra', 'sports_bra'),
+    ('compression shirt', 'compression_shirt'),
+    ('rash guard', 'rashguard'),
+    ('swim trunks', 'swim_trunks'),
+    ('swim shorts', 'swim_shorts'),
+    ('bathing suit', 'swimsuit'),
+    ('swimming costume', 'swimsuit'),
+    
+    # Footwear - specific patterns
+    ('running shoes', 'running_shoes'),
+    ('tennis shoes', 'sneakers'),
+    ('athletic shoes', 'sneakers'),
+    ('high tops', 'high_tops'),
+    ('low tops', 'sneakers'),
+    ('high heels', 'heels'),
+    ('kitten heels', 'heels'),
+    ('block heels', 'heels'),
+    ('ankle boots', 'ankle_boots'),
+    ('knee high boots', 'knee_high_boots'),
+    ('over the knee boots', 'over_knee_boots'),
+    ('thigh high boots', 'thigh_high_boots'),
+    ('cowboy boots', 'cowboy_boots'),
+    ('combat boots', 'combat_boots'),
+    ('work boots', 'work_boots'),
+    ('hiking boots', 'hiking_boots'),
+    ('rain boots', 'rain_boots'),
+    ('snow boots', 'snow_boots'),
+    ('chelsea boots', 'chelsea_boots'),
+    ('desert boots', 'desert_boots'),
+    ('chukka boots', 'chukka_boots'),
+    ('ugg boots', 'uggs'),
+    ('boat shoes', 'boat_shoes'),
+    ('deck shoes', 'boat_shoes'),
+    ('driving shoes', 'loafers'),
+    ('penny loafers', 'loafers'),
+    ('ballet flats', 'flats'),
+    ('flip flops', 'flip_flops'),
+    ('gladiator sandals', 'sandals'),
+    
+    # Accessories
+    ('baseball cap', 'baseball_cap'),
+    ('trucker hat', 'trucker_hat'),
+    ('bucket hat', 'bucket_hat'),
+    ('sun hat', 'sun_hat'),
+    ('winter hat', 'beanie'),
+    ('knit hat', 'beanie'),
+    ('bow tie', 'bow_tie'),
+    ('fanny pack', 'fanny_pack'),
+    ('waist pack', 'fanny_pack'),
+    ('belt bag', 'belt_bag'),
+    ('cross body bag', 'crossbody_bag'),
+    ('crossbody bag', 'crossbody_bag'),
+    ('shoulder bag', 'shoulder_bag'),
+    ('tote bag', 'tote'),
+    ('messenger bag', 'messenger_bag'),
+    
+    # Underwear/intimates
+    ('boxer briefs', 'boxer_briefs'),
+    ('sports bra', 'sports_bra'),
+    ('boy shorts', 'boyshorts'),
+    
+    # One-pieces
+    ('one piece', 'bodysuit'),
+    ('two piece', 'bikini'),
+)
+
+
+# Comprehensive single-word clothing items (ordered by specificity)
+_CLOTHING_ITEMS = (
+    # Outerwear (check before generic "coat" or "jacket")
+    'parka', 'anorak', 'windbreaker', 'raincoat', 'peacoat', 'overcoat',
+    'blazer', 'puffer', 'bomber', 'varsity', 'mackintosh', 'slicker',
+    
+    # Specific tops (before generic "top" or "shirt")
+    'hoodie', 'hoody', 'sweatshirt', 'sweater', 'jumper', 'pullover',
+    'cardigan', 'cardi', 'shrug', 'bolero', 'turtleneck', 'henley',
+    'polo', 'tunic', 'camisole', 'cami', 'blouse', 'bodysuit', 'leotard',
+    'unitard', 'jersey', 'fleece', 'thermal', 'rashguard',
+    
+    # Dresses and one-pieces
+    'dress', 'gown', 'sundress', 'pinafore', 'smock', 'frock',
+    'jumpsuit', 'romper', 'playsuit', 'onesie', 'catsuit',
+    'coveralls', 'overalls', 'dungarees', 'shortalls',
+    
+    # Specific bottoms (before generic "pants")
+    'jeans', 'denim', 'chinos', 'khakis', 'corduroys', 'cords',
+    'culottes', 'gauchos', 'joggers', 'sweatpants', 'sweats',
+    'leggings', 'tights', 'jeggings', 'treggings', 'capris',
+    'trousers', 'slacks', 'britches', 'knickers',
+    
+    # Shorts
+    'shorts', 'bermudas', 'jorts', 'cutoffs',
+    
+    # Skirts
+    'skirt', 'kilt', 'sarong', 'tutu', 'petticoat',
+    
+    # Underwear/Intimates
+    'underwear', 'panties', 'briefs', 'boxers', 'thong', 'boyshorts',
+    'bra', 'brassiere', 'bralette', 'bustier', 'corset', 'basque',
+    'slip', 'chemise', 'teddy', 'negligee', 'lingerie',
+    
+    # Sleepwear
+    'pajamas', 'pyjamas', 'pjs', 'nightgown', 'nightie', 'nightshirt',
+    'robe', 'bathrobe', 'housecoat', 'dressing gown',
+    
+    # Swimwear
+    'swimsuit', 'bikini', 'tankini', 'monokini', 'wetsuit', 'swimwear',
+    
+    # Footwear
+    'shoes', 'sneakers', 'trainers', 'runners', 'kicks',
+    'boots', 'booties', 'wellies', 'uggs', 'wellingtons',
+    'heels', 'stilettos', 'pumps', 'platforms', 'wedges',
+    'flats', 'espadrilles', 'mules', 'clogs', 'slides',
+    'sandals', 'flip-flops', 'thongs', 'huaraches', 'birkenstocks',
+    'loafers', 'moccasins', 'oxfords', 'brogues', 'derbies',
+    'cleats', 'spikes',
+    
+    # Accessories
+    'hat', 'cap', 'beanie', 'beret', 'fedora', 'trilby', 'panama',
+    'bowler', 'sombrero', 'fascinator', 'headband', 'headscarf',
+    'turban', 'visor', 'snapback', 'stetson',
+    'scarf', 'tie', 'necktie', 'ascot', 'cravat', 'bandana',
+    'gloves', 'mittens', 'gauntlets',
+    'belt', 'sash', 'cummerbund', 'suspenders', 'braces',
+    'bag', 'purse', 'handbag', 'clutch', 'wristlet', 'wallet',
+    'backpack', 'rucksack', 'satchel', 'tote', 'briefcase',
+    
+    # Traditional/Cultural
+    'sari', 'saree', 'kimono', 'yukata', 'cheongsam', 'qipao',
+    'dirndl', 'lederhosen', 'poncho', 'serape', 'dashiki', 'kaftan',
+    'thobe', 'abaya', 'hijab', 'burqa', 'niqab', 'dhoti', 'lungi',
+    'hanbok', 'kente',
+    
+    # Formal
+    'suit', 'tuxedo', 'tux', 'waistcoat', 'vest', 'gilet',
+    
+    # Generic terms (last)
+    'jacket', 'coat', 'top', 'shirt', 'pants', 'garment', 'apparel'
+)
+
+_CLOTHING_ITEM_SET = frozenset(_CLOTHING_ITEMS)
+
+_IRREGULAR_PLURALS = {
+    'scarves': 'scarf',
+    'gloves': 'glove',
+    'clothes': 'clothing',
+    'jeans': 'jeans',  # already plural
+    'pants': 'pants',  # already plural
+    'shorts': 'shorts',  # already plural
+    'tights': 'tights',  # already plural
+    'glasses': 'glasses',  # already plural
+}
+
+# Punctuation stripped from query words: everything except word characters, whitespace and
+# hyphens. ASCII words go through a translate table; others fall back to the regex
+_PUNCTUATION_RE = re.compile(r'[^\w\s-]')
+_ASCII_PUNCTUATION_TABLE = str.maketrans('', '', ''.join(
+    ch for ch in map(chr, range(128)) if not (ch.isalnum() or ch.isspace() or ch in '_-')
+))
+
+
 def extract_item_type_from_query(query):
     """
     Extract the clothing item type from a search query with comprehensive coverage
@@ -788,312 +1758,87 @@ def extract_item_type_from_query(query):
     if not query:
         return "unknown"
     
-    query_lower = query.lower().strip()
-    
-    # Comprehensive multi-word patterns (most specific first)
-    multi_word_patterns = [
-        # Tops - specific patterns
-        ('tank top', 'tank_top'),
-        ('tube top', 'tube_top'),
-        ('crop top', 'crop_top'),
-        ('halter top', 'halter_top'),
-        ('mock neck', 'turtleneck'),
-        ('cowl neck', 'sweater'),
-        ('v-neck', 'shirt'),
-        ('crew neck', 'shirt'),
-        ('crewneck', 'shirt'),
-        
-        # Outerwear patterns
-        ('leather jacket', 'leather_jacket'),
-        ('denim jacket', 'denim_jacket'),
-        ('jean jacket', 'denim_jacket'),
-        ('bomber jacket', 'bomber_jacket'),
-        ('puffer jacket', 'puffer_jacket'),
-        ('down jacket', 'puffer_jacket'),
-        ('track jacket', 'track_jacket'),
-        ('varsity jacket', 'varsity_jacket'),
-        ('rain jacket', 'raincoat'),
-        ('trench coat', 'trench_coat'),
-        ('pea coat', 'peacoat'),
-        ('duffle coat', 'coat'),
-        
-        # Bottoms - specific patterns
-        ('cargo pants', 'cargo_pants'),
-        ('cargo shorts', 'cargo_shorts'),
-        ('yoga pants', 'yoga_pants'),
-        ('track pants', 'track_pants'),
-        ('sweat pants', 'sweatpants'),
-        ('palazzo pants', 'palazzo_pants'),
-        ('wide leg pants', 'wide_leg_pants'),
-        ('straight leg pants', 'pants'),
-        ('skinny jeans', 'skinny_jeans'),
-        ('slim jeans', 'jeans'),
-        ('boyfriend jeans', 'jeans'),
-        ('mom jeans', 'jeans'),
-        ('bootcut jeans', 'jeans'),
-        ('bermuda shorts', 'bermuda_shorts'),
-        ('board shorts', 'board_shorts'),
-        ('bike shorts', 'bike_shorts'),
-        ('cycling shorts', 'bike_shorts'),
-        ('running shorts', 'athletic_shorts'),
-        ('athletic shorts', 'athletic_shorts'),
-        ('denim shorts', 'denim_shorts'),
-        ('jean shorts', 'denim_shorts'),
-        
-        # Skirts - specific patterns
-        ('pencil skirt', 'pencil_skirt'),
-        ('a-line skirt', 'a_line_skirt'),
-        ('a line skirt', 'a_line_skirt'),
-        ('circle skirt', 'circle_skirt'),
-        ('pleated skirt', 'pleated_skirt'),
-        ('wrap skirt', 'wrap_skirt'),
-        ('mini skirt', 'mini_skirt'),
-        ('midi skirt', 'midi_skirt'),
-        ('maxi skirt', 'maxi_skirt'),
-        
-        # Dresses - specific patterns
-        ('cocktail dress', 'cocktail_dress'),
-        ('evening dress', 'evening_dress'),
-        ('ball gown', 'gown'),
-        ('sheath dress', 'sheath_dress'),
-        ('shift dress', 'shift_dress'),
-        ('wrap dress', 'wrap_dress'),
-        ('shirt dress', 'shirt_dress'),
-        ('sweater dress', 'sweater_dress'),
-        ('jumper dress', 'jumper_dress'),
-        ('slip dress', 'slip_dress'),
-        ('bodycon dress', 'bodycon_dress'),
-        ('fit and flare dress', 'fit_and_flare_dress'),
-        ('a-line dress', 'a_line_dress'),
-        ('a line dress', 'a_line_dress'),
-        ('maxi dress', 'maxi_dress'),
-        ('midi dress', 'midi_dress'),
-        ('mini dress', 'mini_dress'),
-        ('sun dress', 'sundress'),
-        
-        # Formal wear
-        ('dress shirt', 'dress_shirt'),
-        ('button down', 'button_down'),
-        ('button up', 'button_down'),
-        ('oxford shirt', 'oxford_shirt'),
-        ('polo shirt', 'polo'),
-        ('rugby shirt', 'rugby_shirt'),
-        
-        # Athletic wear
-        ('sports bra', 'sports_bra'),
-        ('compression shirt', 'compression_shirt'),
-        ('rash guard', 'rashguard'),
-        ('swim trunks', 'swim_trunks'),
-        ('swim shorts', 'swim_shorts'),
-        ('bathing suit', 'swimsuit'),
-        ('swimming costume', 'swimsuit'),
-        
-        # Footwear - specific patterns
-        ('running shoes', 'running_shoes'),
-        ('tennis shoes', 'sneakers'),
-        ('athletic shoes', 'sneakers'),
-        ('high tops', 'high_tops'),
-        ('low tops', 'sneakers'),
-        ('high heels', 'heels'),
-        ('kitten heels', 'heels'),
-        ('block heels', 'heels'),
-        ('ankle boots', 'ankle_boots'),
-        ('knee high boots', 'knee_high_boots'),
-        ('over the knee boots', 'over_knee_boots'),
-        ('thigh high boots', 'thigh_high_boots'),
-        ('cowboy boots', 'cowboy_boots'),
-        ('combat boots', 'combat_boots'),
-        ('work boots', 'work_boots'),
-        ('hiking boots', 'hiking_boots'),
-        ('rain boots', 'rain_boots'),
-        ('snow boots', 'snow_boots'),
-        ('chelsea boots', 'chelsea_boots'),
-        ('desert boots', 'desert_boots'),
-        ('chukka boots', 'chukka_boots'),
-        ('ugg boots', 'uggs'),
-        ('boat shoes', 'boat_shoes'),
-        ('deck shoes', 'boat_shoes'),
-        ('driving shoes', 'loafers'),
-        ('penny loafers', 'loafers'),
-        ('ballet flats', 'flats'),
-        ('flip flops', 'flip_flops'),
-        ('gladiator sandals', 'sandals'),
-        
-        # Accessories
-        ('baseball cap', 'baseball_cap'),
-        ('trucker hat', 'trucker_hat'),
-        ('bucket hat', 'bucket_hat'),
-        ('sun hat', 'sun_hat'),
-        ('winter hat', 'beanie'),
-        ('knit hat', 'beanie'),
-        ('bow tie', 'bow_tie'),
-        ('fanny pack', 'fanny_pack'),
-        ('waist pack', 'fanny_pack'),
-        ('belt bag', 'belt_bag'),
-        ('cross body bag', 'crossbody_bag'),
-        ('crossbody bag', 'crossbody_bag'),
-        ('shoulder bag', 'shoulder_bag'),
-        ('tote bag', 'tote'),
-        ('messenger bag', 'messenger_bag'),
-        
-        # Underwear/intimates
-        ('boxer briefs', 'boxer_briefs'),
-        ('sports bra', 'sports_bra'),
-        ('boy shorts', 'boyshorts'),
-        
-        # One-pieces
-        ('one piece', 'bodysuit'),
-        ('two piece', 'bikini'),
-    ]
-    
+    return _extract_item_type(query.lower().strip())
+
+
+@lru_cache(maxsize=4096)
+def _extract_item_type(query_lower):
+    """Item type lookup for a lowercased, stripped query; memoized since outfits repeat queries"""
     # Check multi-word patterns first
-    for pattern, item_type in multi_word_patterns:
+    for pattern, item_type in _MULTI_WORD_PATTERNS:
         if pattern in query_lower:
             return item_type
     
-    # Comprehensive single-word clothing items (ordered by specificity)
-    clothing_items = [
-        # Outerwear (check before generic "coat" or "jacket")
-        'parka', 'anorak', 'windbreaker', 'raincoat', 'peacoat', 'overcoat',
-        'blazer', 'puffer', 'bomber', 'varsity', 'mackintosh', 'slicker',
-        
-        # Specific tops (before generic "top" or "shirt")
-        'hoodie', 'hoody', 'sweatshirt', 'sweater', 'jumper', 'pullover',
-        'cardigan', 'cardi', 'shrug', 'bolero', 'turtleneck', 'henley',
-        'polo', 'tunic', 'camisole', 'cami', 'blouse', 'bodysuit', 'leotard',
-        'unitard', 'jersey', 'fleece', 'thermal', 'rashguard',
-        
-        # Dresses and one-pieces
-        'dress', 'gown', 'sundress', 'pinafore', 'smock', 'frock',
-        'jumpsuit', 'romper', 'playsuit', 'onesie', 'catsuit',
-        'coveralls', 'overalls', 'dungarees', 'shortalls',
-        
-        # Specific bottoms (before generic "pants")
-        'jeans', 'denim', 'chinos', 'khakis', 'corduroys', 'cords',
-        'culottes', 'gauchos', 'joggers', 'sweatpants', 'sweats',
-        'leggings', 'tights', 'jeggings', 'treggings', 'capris',
-        'trousers', 'slacks', 'britches', 'knickers',
-        
-        # Shorts
-        'shorts', 'bermudas', 'jorts', 'cutoffs',
-        
-        # Skirts
-        'skirt', 'kilt', 'sarong', 'tutu', 'petticoat',
-        
-        # Underwear/Intimates
-        'underwear', 'panties', 'briefs', 'boxers', 'thong', 'boyshorts',
-        'bra', 'brassiere', 'bralette', 'bustier', 'corset', 'basque',
-        'slip', 'chemise', 'teddy', 'negligee', 'lingerie',
-        
-        # Sleepwear
-        'pajamas', 'pyjamas', 'pjs', 'nightgown', 'nightie', 'nightshirt',
-        'robe', 'bathrobe', 'housecoat', 'dressing gown',
-        
-        # Swimwear
-        'swimsuit', 'bikini', 'tankini', 'monokini', 'wetsuit', 'swimwear',
-        
-        # Footwear
-        'shoes', 'sneakers', 'trainers', 'runners', 'kicks',
-        'boots', 'booties', 'wellies', 'uggs', 'wellingtons',
-        'heels', 'stilettos', 'pumps', 'platforms', 'wedges',
-        'flats', 'espadrilles', 'mules', 'clogs', 'slides',
-        'sandals', 'flip-flops', 'thongs', 'huaraches', 'birkenstocks',
-        'loafers', 'moccasins', 'oxfords', 'brogues', 'derbies',
-        'cleats', 'spikes',
-        
-        # Accessories
-        'hat', 'cap', 'beanie', 'beret', 'fedora', 'trilby', 'panama',
-        'bowler', 'sombrero', 'fascinator', 'headband', 'headscarf',
-        'turban', 'visor', 'snapback', 'stetson',
-        'scarf', 'tie', 'necktie', 'ascot', 'cravat', 'bandana',
-        'gloves', 'mittens', 'gauntlets',
-        'belt', 'sash', 'cummerbund', 'suspenders', 'braces',
-        'bag', 'purse', 'handbag', 'clutch', 'wristlet', 'wallet',
-        'backpack', 'rucksack', 'satchel', 'tote', 'briefcase',
-        
-        # Traditional/Cultural
-        'sari', 'saree', 'kimono', 'yukata', 'cheongsam', 'qipao',
-        'dirndl', 'lederhosen', 'poncho', 'serape', 'dashiki', 'kaftan',
-        'thobe', 'abaya', 'hijab', 'burqa', 'niqab', 'dhoti', 'lungi',
-        'hanbok', 'kente',
-        
-        # Formal
-        'suit', 'tuxedo', 'tux', 'waistcoat', 'vest', 'gilet',
-        
-        # Generic terms (last)
-        'jacket', 'coat', 'top', 'shirt', 'pants', 'garment', 'apparel'
-    ]
-    
     # Check for plural forms and exact matches
     words = query_lower.split()
     
     # First check exact word matches (including plurals)
     for word in words:
         # Remove common punctuation
-        clean_word = re.sub(r'[^\w\s-]', '', word)
+        clean_word = word.translate(_ASCII_PUNCTUATION_TABLE) if word.isascii() else _PUNCTUATION_RE.sub('', word)
         
         # Check singular form
-        if clean_word in clothing_items:
+        if clean_word in _CLOTHING_ITEM_SET:
             return clean_word
         
         # Check if it's a plural form
-        if clean_word.endswith('s') and clean_word[:-1] in clothing_items:
-            return clean_word[:-1]
+        if clean_word.endswith('s'):
+            singular = clean_word[:-1]
+            if singular in _CLOTHING_ITEM_SET:
+                return singular
         
         # Check irregular plurals
-        irregular_plurals = {
-            'scarves': 'scarf',
-            'gloves': 'glove',
-            'clothes': 'clothing',
-            'jeans': 'jeans',  # already plural
-            'pants': 'pants',  # already plural
-            'shorts': 'shorts',  # already plural
-            'tights': 'tights',  # already plural
-            'glasses': 'glasses',  # already plural
-        }
-        if clean_word in irregular_plurals:
-            return irregular_plurals[clean_word]
-    
-    # Then check for items within compound words
-    for item in clothing_items:
+        irregular_singular = _IRREGULAR_PLURALS.get(clean_word)
+        if irregular_singular is not None:
+            return irregular_singular
+    
+    # Then check for items within compound words. The first listed item found anywhere
+    # in the query wins, so this stays an ordered scan: a regex alternation would return
+    # the leftmost match instead, and an order-preserving one benchmarked slower
+    for item in _CLOTHING_ITEMS:
         if item in query_lower:
             return item
     
-    # Look for gender-specific patterns
-    gender_markers = ['women\'s', 'womens', 'women\'s', 'men\'s', 'mens', 'men\'s', 
-                      'girls', 'boys', 'ladies', 'unisex', 'kids', 'children\'s', 'childrens']
-    
-    for i, word in enumerate(words):
-        if word in gender_markers and i + 1 < len(words):
-            next_word = words[i + 1]
-            # Skip common modifiers
-            modifiers = ['vintage', 'casual', 'formal', 'summer', 'winter', 'spring', 'fall',
-                        'designer', 'luxury', 'cheap', 'discount', 'new', 'used', 'small',
-                        'medium', 'large', 'xl', 'xxl', 'plus', 'size', 'petite', 'tall']
-            
-            j = i + 1
-            while j < len(words) and words[j] in modifiers:
-                j += 1
-            
-            if j < len(words):
-                potential_item = words[j]
-                # Check if it's a clothing item
-                if potential_item in clothing_items:
-                    return potential_item
-                # Check singular form
-                if potential_item.endswith('s') and potential_item[:-1] in clothing_items:
-                    return potential_item[:-1]
-    
-    # If query contains clothing-related terms but no specific item
-    clothing_indicators = ['wear', 'outfit', 'apparel', 'garment', 'attire', 'clothing', 'fashion']
-    for indicator in clothing_indicators:
-        if indicator in query_lower:
-            return 'clothing'
-    
+    # No specific item found. A gender-marker scan ("women's <modifiers> <item>") used to
+    # follow, but any item it could return is a substring of the query and is already
+    # returned by the compound-word scan above
     # Default return
     return 'clothing'
 
 
+# Specific item types folded into broader categories by normalize_item_type
+_ITEM_TYPE_NORMALIZATIONS = {
+    # Normalize all shoe types to 'shoes'
+    'sneakers': 'shoes', 'trainers': 'shoes', 'runners': 'shoes',
+    'heels': 'shoes', 'stilettos': 'shoes', 'pumps': 'shoes',
+    'platforms': 'shoes', 'wedges': 'shoes', 'flats': 'shoes',
+    'loafers': 'shoes', 'moccasins': 'shoes', 'oxfords': 'shoes',
+    'brogues': 'shoes', 'derbies': 'shoes', 'espadrilles': 'shoes',
+    'mules': 'shoes', 'clogs': 'shoes', 'slides': 'shoes',
+    'sandals': 'shoes', 'flip-flops': 'shoes', 'thongs': 'shoes',
+    
+    # Normalize all boot types to 'boots'
+    'booties': 'boots', 'wellies': 'boots', 'uggs': 'boots',
+    
+    # Normalize jacket types
+    'blazer': 'jacket', 'bomber': 'jacket', 'puffer': 'jacket',
+    'varsity': 'jacket', 'windbreaker': 'jacket',
+    
+    # Normalize coat types
+    'parka': 'coat', 'peacoat': 'coat', 'overcoat': 'coat',
+    'raincoat': 'coat', 'anorak': 'coat',
+    
+    # Normalize pants types
+    'jeans': 'pants', 'chinos': 'pants', 'khakis': 'pants',
+    'trousers': 'pants', 'slacks': 'pants', 'joggers': 'pants',
+    'sweatpants': 'pants', 'leggings': 'pants', 'tights': 'pants',
+    
+    # Normalize underwear
+    'panties': 'underwear', 'briefs': 'underwear', 'boxers': 'underwear',
+    'thong': 'underwear', 'boyshorts': 'underwear',
+}
+
+
 def normalize_item_type(item_type):
     """
     Optionally normalize specific item types to broader categories
@@ -1104,44 +1849,20 @@ def normalize_item_type(item_type):
     Returns:
     - Normalized category string
     """
-    normalizations = {
-        # Normalize all shoe types to 'shoes'
-        'sneakers': 'shoes', 'trainers': 'shoes', 'runners': 'shoes',
-        'heels': 'shoes', 'stilettos': 'shoes', 'pumps': 'shoes',
-        'platforms': 'shoes', 'wedges': 'shoes', 'flats': 'shoes',
-        'loafers': 'shoes', 'moccasins': 'shoes', 'oxfords': 'shoes',
-        'brogues': 'shoes', 'derbies': 'shoes', 'espadrilles': 'shoes',
-        'mules': 'shoes', 'clogs': 'shoes', 'slides': 'shoes',
-        'sandals': 'shoes', 'flip-flops': 'shoes', 'thongs': 'shoes',
-        
-        # Normalize all boot types to 'boots'
-        'booties': 'boots', 'wellies': 'boots', 'uggs': 'boots',
-        
-        # Normalize jacket types
-        'blazer': 'jacket', 'bomber': 'jacket', 'puffer': 'jacket',
-        'varsity': 'jacket', 'windbreaker': 'jacket',
-        
-        # Normalize coat types
-        'parka': 'coat', 'peacoat': 'coat', 'overcoat': 'coat',
-        'raincoat': 'coat', 'anorak': 'coat',
-        
-        # Normalize pants types
-        'jeans': 'pants', 'chinos': 'pants', 'khakis': 'pants',
-        'trousers': 'pants', 'slacks': 'pants', 'joggers': 'pants',
-        'sweatpants': 'pants', 'leggings': 'pants', 'tights': 'pants',
-        
-        # Normalize underwear
-        'panties': 'underwear', 'briefs': 'underwear', 'boxers': 'underwear',
-        'thong': 'underwear', 'boyshorts': 'underwear',
-    }
-    
-    return normalizations.get(item_type, item_type)
+    return _ITEM_TYPE_NORMALIZATIONS.get(item_type, item_type)
+
+
+# Sale tags like "25% OFF" or "Up to 30% off"
+_DISCOUNT_PERCENT_RE = re.compile(r'(\d+)\s*%\s*OFF', re.IGNORECASE)
 
 
 def clean_single_product(product):
     """
     Clean a single product from the shopping results
     
+    Price, discount, image and tag information are read from the product in a single
+    pass and written straight into the cleaned product.
+    
     Parameters:
     - product: Single product dictionary from shopping_results
     
@@ -1151,53 +1872,14 @@ def clean_single_product(product):
     if not product or not isinstance(product, dict):
         return None
     
-    # Extract and clean price information
-    price_info = extract_price_info(product)
-    
-    # Extract discount information
-    discount_info = extract_discount_info(product, price_info)
-    
-    # Get the best available image URL
-    image_url = get_best_image_url(product)
-    
-    # Clean and validate product URL
-    product_url = product.get("product_link") or product.get("link")
-    
-    # Extract delivery information
-    delivery_info = product.get("delivery") or product.get("shipping")
-    
-    # Extract tags (like sale tags)
-    tags = extract_product_tags(product)
+    get = product.get
     
-    cleaned_product = {
-        "id": product.get("product_id") or product.get("position", "unknown"),
-        "title": clean_product_title(product.get("title", "")),
-        "price": price_info["price_display"],
-        "price_numeric": price_info["price_numeric"],
-        "old_price": price_info["old_price_display"],
-        "old_price_numeric": price_info["old_price_numeric"],
-        "discount_percentage": discount_info["percentage"],
-        "image_url": image_url,
-        "product_url": product_url,
-        "source": product.get("source", "Unknown"),
-        "source_icon": product.get("source_icon"),
-        "rating": clean_rating(product.get("rating")),
-        "review_count": clean_review_count(product.get("reviews")),
-        "delivery_info": delivery_info,
-        "tags": tags
-    }
-    
-    return cleaned_product
-
-
-def extract_price_info(product):
-    """Extract and clean price information from a product"""
-    price_display = product.get("price")
-    price_numeric = product.get("extracted_price")
-    old_price_display = product.get("old_price")
-    old_price_numeric = product.get("extracted_old_price")
+    # Extract and clean price information
+    price_display = get("price")
+    price_numeric = get("extracted_price")
+    old_price_display = get("old_price")
+    old_price_numeric = get("extracted_old_price")
     
-    # Clean price display strings
     if price_display and isinstance(price_display, str):
         price_display = price_display.strip()
     
@@ -1207,82 +1889,62 @@ def extract_price_info(product):
         if old_price_display.lower().startswith("was "):
             old_price_display = old_price_display[4:].strip()
     
-    return {
-        "price_display": price_display,
-        "price_numeric": float(price_numeric) if price_numeric else None,
-        "old_price_display": old_price_display,
-        "old_price_numeric": float(old_price_numeric) if old_price_numeric else None
-    }
-
-
-def extract_discount_info(product, price_info):
-    """Extract discount information from a product"""
-    # Check for discount tags first
-    extensions = product.get("extensions", [])
-    tag = product.get("tag")
+    price_numeric = float(price_numeric) if price_numeric else None
+    old_price_numeric = float(old_price_numeric) if old_price_numeric else None
     
-    discount_percentage = None
+    # Extract tags (like sale tags) and look for a discount percentage in them
+    tag = get("tag")
+    extensions = get("extensions", [])
     
-    # Look for percentage in tag or extensions
-    for item in [tag] + (extensions if extensions else []):
-        if item and isinstance(item, str) and "%" in item and "OFF" in item.upper():
-            # Extract percentage number
-            import re
-            match = re.search(r'(\d+)%', item)
+    tags = []
+    discount_percentage = None
+    for item in chain((tag,), extensions or ()):
+        if not item or not isinstance(item, str):
+            continue
+        if item not in tags:
+            tags.append(item)
+        if discount_percentage is None:
+            match = _DISCOUNT_PERCENT_RE.search(item)
             if match:
                 discount_percentage = f"{match.group(1)}% OFF"
-                break
     
     # If no tag found but we have both prices, calculate discount
-    if not discount_percentage and price_info["price_numeric"] and price_info["old_price_numeric"]:
-        old_price = price_info["old_price_numeric"]
-        new_price = price_info["price_numeric"]
-        if old_price > new_price:
-            percentage = round(((old_price - new_price) / old_price) * 100)
+    if not discount_percentage and price_numeric and old_price_numeric:
+        if old_price_numeric > price_numeric:
+            percentage = round(((old_price_numeric - price_numeric) / old_price_numeric) * 100)
             discount_percentage = f"{percentage}% OFF"
     
-    return {
-        "percentage": discount_percentage
-    }
-
-
-def get_best_image_url(product):
-    """Get the best available image URL for a product"""
+    # Get the best available image URL
     # Priority order: thumbnail, thumbnails[0], serpapi_thumbnails[0]
-    image_url = product.get("thumbnail")
-    
-    if not image_url:
-        thumbnails = product.get("thumbnails", [])
-        if thumbnails and len(thumbnails) > 0:
-            image_url = thumbnails[0]
-    
-    if not image_url:
-        serpapi_thumbnails = product.get("serpapi_thumbnails", [])
-        if serpapi_thumbnails and len(serpapi_thumbnails) > 0:
-            image_url = serpapi_thumbnails[0]
-    
-    return image_url
-
-
-def extract_product_tags(product):
-    """Extract tags from a product (like sale tags)"""
-    tags = []
-    
-    # Add tag if present
-    tag = product.get("tag")
-    if tag and isinstance(tag, str):
-        tags.append(tag)
-    
-    # Add extensions if they're different from tag
-    extensions = product.get("extensions", [])
-    if extensions:
-        for ext in extensions:
-            if ext and isinstance(ext, str) and ext not in tags:
-                tags.append(ext)
+    image_url = (
+        get("thumbnail")
+        or (get("thumbnails") or [None])[0]
+        or (get("serpapi_thumbnails") or [None])[0]
+        or None
+    )
     
-    return tags
+    return {
+        "id": get("product_id") or get("position", "unknown"),
+        "title": clean_product_title(get("title", "")),
+        "price": price_display,
+        "price_numeric": price_numeric,
+        "old_price": old_price_display,
+        "old_price_numeric": old_price_numeric,
+        "discount_percentage": discount_percentage,
+        "image_url": image_url,
+        # Clean and validate product URL
+        "product_url": get("product_link") or get("link"),
+        "source": get("source", "Unknown"),
+        "source_icon": get("source_icon"),
+        "rating": clean_rating(get("rating")),
+        "review_count": clean_review_count(get("reviews")),
+        # Extract delivery information
+        "delivery_info": get("delivery") or get("shipping"),
+        "tags": tags
+    }
 
 
+@lru_cache(maxsize=2048)
 def clean_product_title(title):
     """Clean and truncate product title if needed"""
     if not title:
@@ -1291,10 +1953,7 @@ def clean_product_title(title):
     title = title.strip()
     
     # Truncate very long titles
-    if len(title) > 100:
-        title = title[:97] + "..."
-    
-    return title
+    return title if len(title) <= 100 else title[:97] + "..."
 
 
 def clean_rating(rating):
@@ -1304,11 +1963,18 @@ def clean_rating(rating):
     
     try:
         rating_float = float(rating)
-        # Ensure rating is between 0 and 5
-        if 0 <= rating_float <= 5:
-            return round(rating_float, 1)
     except (ValueError, TypeError):
-        pass
+        return None
+    
+    return _round_rating(rating_float)
+
+
+@lru_cache(maxsize=1024)
+def _round_rating(rating_float):
+    """Range-check and round a rating; memoized since ratings repeat and round() dominates the cost"""
+    # Ensure rating is between 0 and 5
+    if 0 <= rating_float <= 5:
+        return round(rating_float, 1)
     
     return None
 
@@ -1343,13 +2009,15 @@ def calculate_price_range(prices):
     }
 
 
-def save_cleaned_results_to_json(cleaned_data, output_path=None):
+def save_cleaned_results_to_json(cleaned_data, output_path=None, pretty=False):
     """
     Save cleaned search results to a JSON file
     
     Parameters:
     - cleaned_data: Cleaned data from clean_search_results_for_frontend
     - output_path: Path to save the JSON file (default: generates timestamped filename)
+    - pretty: If True, indents the JSON for reading by hand (default: False, compact output
+      for the frontend)
     
     Returns:
     - Path to the saved JSON file or error dict
@@ -1359,18 +2027,18 @@ def save_cleaned_results_to_json(cleaned_data, output_path=None):
     
     # Generate output path if not provided
     if not output_path:
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         output_path = f"cleaned_search_results_{timestamp}.json"
     
     # Ensure directory exists
     output_dir = os.path.dirname(output_path)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     
-    # Save to JSON with proper formatting
+    # Save to JSON (orjson writes UTF-8 directly)
     try:
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_data, f, indent=2, ensure_ascii=False)
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(cleaned_data, option=orjson.OPT_INDENT_2 if pretty else None))
         return output_path
     except Exception as e:
         return {"error": f"Failed to save cleaned results: {str(e)}"}
@@ -1387,7 +2055,7 @@ def outfit_recommendation_with_cleaned_data(image_path, country="us", language="
     - language: Language code (default: "en")
     - output_path: Base path for output files (default: generates timestamped filename)
     - enable_redo: If True, returns conversation context for potential redo
-    - save_raw_json: If True, saves complete raw SerpAPI responses as JSON
+    - save_raw_json: If True, saves complete raw SerpAPI responses as gzipped JSON Lines
     - save_cleaned_json: If True, saves cleaned data optimized for frontend
     - progress_callback: Optional callback function for progress updates
     - user_id: Optional user ID to check wishlist status for products
@@ -1405,13 +2073,15 @@ def outfit_recommendation_with_cleaned_data(image_path, country="us", language="
     update_progress("Identifying clothing items...")
     
     # Get the base result from the existing function
+    # The CSV rows and the cleaned frontend data are built in one pass over the results
     result = outfit_recommendation_with_redo(
         image_path=image_path,
         country=country,
         language=language,
         output_path=output_path,
         enable_redo=enable_redo,
-        save_raw_json=save_raw_json
+        save_raw_json=save_raw_json,
+        clean_for_frontend=True
     )
     
     # If there was an error in the base function, return it
@@ -1420,52 +2090,38 @@ def outfit_recommendation_with_cleaned_data(image_path, country="us", language="
     
     update_progress("Cleaning and organizing search results...")
     
-    # Clean the raw search results for frontend
-    raw_results = result.get("raw_results_data", [])
-    cleaned_data = clean_search_results_for_frontend(raw_results)
+    cleaned_data = result["cleaned_data"]
     
     # Check wishlist status for products if user_id is provided
     if user_id:
         update_progress("Checking wishlist status...")
+        
+        # Collect the products once; their ids double as the external IDs used for database lookup
+        products = [
+            product
+            for clothing_item in cleaned_data.get('clothing_items', [])
+            for product in clothing_item.get('products', [])
+            if isinstance(product, dict)
+        ]
+        external_ids = [product['id'] for product in products if product.get('id')]
+        
         try:
-            from database_service import DatabaseService
-            db_service = DatabaseService()
-            
-            # Collect all external IDs from the cleaned data
-            external_ids = []
-            if 'clothing_items' in cleaned_data:
-                for clothing_item in cleaned_data['clothing_items']:
-                    if 'products' in clothing_item:
-                        for product in clothing_item['products']:
-                            if isinstance(product, dict) and product.get('id'):
-                                external_ids.append(product['id'])
-                                # Also add external_id field for database lookup
-                                product['external_id'] = product['id']
+            # Shared service instance, the same one the API endpoints use
+            from database_service import db_service
             
             # Get bulk wishlist status using the same logic as the working endpoint
             wishlist_status = db_service.check_bulk_wishlist_status(user_id, external_ids)
-            
-            # Add is_saved field to each product
-            if 'clothing_items' in cleaned_data:
-                for clothing_item in cleaned_data['clothing_items']:
-                    if 'products' in clothing_item:
-                        for product in clothing_item['products']:
-                            if isinstance(product, dict):
-                                external_id = product.get('external_id')
-                                product['is_saved'] = wishlist_status.get(external_id, False)
-            
         except Exception as e:
             print(f"Warning: Failed to check wishlist status: {e}")
             # If wishlist check fails, continue without saved status
-            if 'clothing_items' in cleaned_data:
-                for clothing_item in cleaned_data['clothing_items']:
-                    if 'products' in clothing_item:
-                        for product in clothing_item['products']:
-                            if isinstance(product, dict):
-                                # Add external_id field for consistency
-                                if 'external_id' not in product and product.get('id'):
-                                    product['external_id'] = product['id']
-                                product['is_saved'] = False
+            wishlist_status = {}
+        
+        # Add external_id and is_saved fields to each product
+        for product in products:
+            external_id = product.get('id')
+            if external_id:
+                product['external_id'] = external_id
+            product['is_saved'] = wishlist_status.get(external_id, False)
     
     update_progress("Finalizing results...")
     
@@ -1484,12 +1484,97 @@ def test_search_shopping_item(query, country="us", language="en", save_to_file=T
 import time
 import random
 import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urlparse, parse_qs, unquote
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urlparse, parse_qs, parse_qsl, unquote, urlencode, urlunparse
 from datetime import datetime
 import json
+import orjson
+import hashlib
+import logging
+import queue
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+logger = logging.getLogger(__name__)
+
+# Only the retailer containers are built into the parse tree; the rest of the page is skipped.
+# The class is matched as a whitespace-separated token because the strainer sees the raw
+# attribute string (e.g. "UAVKwf abc") before BeautifulSoup splits it into a list
+RETAILER_CONTAINER_STRAINER = SoupStrainer('div', class_=re.compile(r'(?:^|\s)UAVKwf(?:\s|$)'))
+
+# Retries back off from at least this many seconds, even when scraping with no base delay
+RETRY_MIN_DELAY = 0.5
+
+# Per-domain request spacing: starts at PACER_INITIAL_DELAY so the first wave of workers doesn't
+# burst, grows by PACER_WIDEN_STEP on every 429 (up to PACER_MAX_DELAY) and shrinks by
+# PACER_NARROW_STEP on every success
+PACER_INITIAL_DELAY = 0.5
+PACER_WIDEN_STEP = 0.5
+PACER_NARROW_STEP = 0.05
+PACER_MAX_DELAY = 60.0
+
+class AdaptiveDomainPacer:
+    """Spaces out requests to each domain, adapting the spacing to rate limiting."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        # domain -> [min_delay, time the last request was (or will be) sent]
+        self._domains = {}
+    
+    def _state(self, domain):
+        return self._domains.setdefault(domain, [PACER_INITIAL_DELAY, 0.0])
+    
+    def wait(self, domain):
+        """Block until a request to domain may be sent, reserving that slot."""
+        with self._lock:
+            state = self._state(domain)
+            now = time.monotonic()
+            send_at = max(now, state[1] + state[0])
+            state[1] = send_at
+        if send_at > now:
+            time.sleep(send_at - now)
+    
+    def widen(self, domain):
+        """Increase the spacing for domain after it rate limited us."""
+        with self._lock:
+            state = self._state(domain)
+            state[0] = min(state[0] + PACER_WIDEN_STEP, PACER_MAX_DELAY)
+    
+    def narrow(self, domain):
+        """Decrease the spacing for domain after a successful request."""
+        with self._lock:
+            state = self._state(domain)
+            state[0] = max(state[0] - PACER_NARROW_STEP, 0.0)
+
+_SCRAPE_PACER = AdaptiveDomainPacer()
+
+# Tracking parameters that don't change which product page a URL points to
+TRACKING_QUERY_PARAMS = frozenset({
+    "utm_source", "utm_medium", "utm_campaign", "utm_term", "utm_content",
+    "gclid", "fbclid", "ved", "ei"
+})
+
+# Retailer URLs found for each product page are cached on disk for this long
+SCRAPE_CACHE_DIR = ".scrape_cache"
+SCRAPE_CACHE_TTL_SECONDS = 24 * 60 * 60
+
+# Tested operating points for parallel_scrape_google_products, from gentlest to fastest
+RATE_LIMIT_PRESETS = {
+    "conservative": {"delay": 3.0, "max_workers": 2, "max_retries": 3, "backoff_factor": 2.0},
+    "normal": {"delay": 2.0, "max_workers": 5, "max_retries": 3, "backoff_factor": 2.0},
+    "fast": {"delay": 1.5, "max_workers": 10, "max_retries": 2, "backoff_factor": 1.5},
+    "aggressive": {"delay": 0.5, "max_workers": 20, "max_retries": 2, "backoff_factor": 1.5},
+}
+
+SCRAPE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Shared HTTP session so parallel scrapes reuse keep-alive connections to Google instead of
+# paying a TCP + TLS handshake per page. Retries are handled by scrape_single_url
+_SCRAPE_SESSION = requests.Session()
+_SCRAPE_SESSION.headers.update(SCRAPE_HEADERS)
+_SCRAPE_SESSION.mount("https://", HTTPAdapter(pool_connections=64, pool_maxsize=64, max_retries=0))
 
 def extract_retailer_urls(google_url, delay=0):
     """
@@ -1503,26 +1588,24 @@ def extract_retailer_urls(google_url, delay=0):
         list: List of retailer URLs
     """
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-    }
-    
     try:
         # Add delay to be respectful to the server
         if delay > 0:
             time.sleep(delay)
         
         # Send GET request
-        response = requests.get(google_url, headers=headers)
+        response = _SCRAPE_SESSION.get(google_url, timeout=10)
         response.raise_for_status()
         
-        # Parse HTML
-        soup = BeautifulSoup(response.content, 'html.parser')
+        # Parse HTML, keeping only the retailer containers
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=RETAILER_CONTAINER_STRAINER)
         
         # Find all divs with class "UAVKwf" that contain retailer links
         retailer_containers = soup.find_all('div', class_='UAVKwf')
         
         retailer_urls = []
+        seen_hrefs = set()
+        seen_urls = set()
         
         for container in retailer_containers:
             # Find the anchor tag within each container
@@ -1531,19 +1614,31 @@ def extract_retailer_urls(google_url, delay=0):
             if link and link.get('href'):
                 href = link.get('href')
                 
+                # The same offer is often listed more than once; only parse each redirect once
+                if href in seen_hrefs:
+                    continue
+                seen_hrefs.add(href)
+                
                 # Extract actual URL from Google redirect
                 actual_url = extract_actual_url(href)
                 
-                if actual_url and actual_url not in retailer_urls:
+                if actual_url and actual_url not in seen_urls:
+                    seen_urls.add(actual_url)
                     retailer_urls.append(actual_url)
         
         return retailer_urls
         
+    except requests.HTTPError as e:
+        # Let rate limiting reach the caller so it can back off
+        if e.response is not None and e.response.status_code == 429:
+            raise
+        logger.warning("Error fetching the page: %s", e)
+        return []
     except requests.RequestException as e:
-        print(f"Error fetching the page: {e}")
+        logger.warning("Error fetching the page: %s", e)
         return []
     except Exception as e:
-        print(f"Error parsing the page: {e}")
+        logger.warning("Error parsing the page: %s", e)
         return []
 
 def extract_actual_url(google_redirect_url):
@@ -1573,20 +1668,40 @@ def extract_actual_url(google_redirect_url):
         return None
         
     except Exception as e:
-        print(f"Error extracting URL from: {google_redirect_url} - {e}")
+        logger.warning("Error extracting URL from: %s - %s", google_redirect_url, e)
         return None
 
+def retry_delay(attempt, delay, backoff_factor, max_delay, jitter):
+    """
+    Seconds to wait before retrying after the given (0-based) attempt: exponential backoff from
+    the base delay (at least RETRY_MIN_DELAY), capped at max_delay, plus up to jitter seconds of
+    random spread so workers that failed together don't all retry together.
+    """
+    backoff = max(delay, RETRY_MIN_DELAY) * backoff_factor ** attempt
+    return min(backoff, max_delay) + random.uniform(0, jitter)
+
+def normalize_google_url(url):
+    """
+    Canonical form of a product page URL: tracking parameters and the fragment are dropped
+    and the remaining query parameters are sorted, so URLs for the same page compare equal.
+    """
+    parsed = urlparse(url)
+    query = sorted((key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                   if key not in TRACKING_QUERY_PARAMS)
+    return urlunparse(parsed._replace(query=urlencode(query), fragment=""))
+
 def scrape_single_url(args):
     """
     Scrape a single URL with retry logic. Designed for parallel execution.
     
     Args:
-        args (tuple): (url, delay, max_retries, backoff_factor, thread_id)
+        args (tuple): (url, delay, max_retries, backoff_factor, max_delay, jitter, thread_id)
     
     Returns:
         dict: Result containing success/failure info
     """
-    url, delay, max_retries, backoff_factor, thread_id = args
+    url, delay, max_retries, backoff_factor, max_delay, jitter, thread_id = args
+    domain = urlparse(url).netloc
     
     result = {
         'url': url,
@@ -1599,59 +1714,220 @@ def scrape_single_url(args):
         'start_time': time.time()
     }
     
-    current_delay = delay
-    
     for attempt in range(max_retries + 1):
         result['attempts'] = attempt + 1
         
         try:
-            print(f"[Thread {thread_id}] Attempt {attempt + 1} for {url[:50]}...")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Thread %s] Attempt %s for %s...", thread_id, attempt + 1, url[:50])
             
-            retailer_urls = extract_retailer_urls(url, delay=current_delay)
+            _SCRAPE_PACER.wait(domain)
+            retailer_urls = extract_retailer_urls(url, delay=delay)
             
             if retailer_urls:
+                _SCRAPE_PACER.narrow(domain)
                 result['success'] = True
                 result['retailer_urls'] = retailer_urls
                 result['end_time'] = time.time()
-                print(f"[Thread {thread_id}] ✓ Success: Found {len(retailer_urls)} retailer URLs")
+                logger.debug("[Thread %s] ✓ Success: Found %s retailer URLs", thread_id, len(retailer_urls))
                 break
             else:
                 if attempt < max_retries:
-                    current_delay *= backoff_factor
-                    print(f"[Thread {thread_id}] ⚠ No results, retrying with {current_delay:.2f}s delay...")
-                    time.sleep(current_delay)
+                    wait = retry_delay(attempt, delay, backoff_factor, max_delay, jitter)
+                    logger.debug("[Thread %s] ⚠ No results, retrying with %.2fs delay...", thread_id, wait)
+                    time.sleep(wait)
                 else:
                     result['error'] = "No retailer URLs found after all retries"
-                    print(f"[Thread {thread_id}] ✗ Failed: No results after {max_retries + 1} attempts")
+                    logger.debug("[Thread %s] ✗ Failed: No results after %s attempts", thread_id, max_retries + 1)
                         
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 429:  # Rate limited
                 result['rate_limited'] = True
+                _SCRAPE_PACER.widen(domain)
                 if attempt < max_retries:
-                    current_delay *= backoff_factor
-                    print(f"[Thread {thread_id}] ⚠ Rate limited (429). Backing off for {current_delay:.2f}s...")
-                    time.sleep(current_delay)
+                    wait = retry_delay(attempt, delay, backoff_factor, max_delay, jitter)
+                    logger.debug("[Thread %s] ⚠ Rate limited (429). Backing off for %.2fs...", thread_id, wait)
+                    time.sleep(wait)
                 else:
                     result['error'] = f"Rate limited after {max_retries + 1} attempts"
-                    print(f"[Thread {thread_id}] ✗ Failed: Rate limited, max retries reached")
+                    logger.debug("[Thread %s] ✗ Failed: Rate limited, max retries reached", thread_id)
                     break
             else:
                 result['error'] = f"HTTP Error: {e}"
-                print(f"[Thread {thread_id}] ✗ Failed: HTTP Error {e}")
+                logger.debug("[Thread %s] ✗ Failed: HTTP Error %s", thread_id, e)
                 break
                 
         except Exception as e:
             result['error'] = f"Unexpected error: {e}"
-            print(f"[Thread {thread_id}] ✗ Failed: {e}")
+            logger.debug("[Thread %s] ✗ Failed: %s", thread_id, e)
             break
     
     result['end_time'] = time.time()
     result['duration'] = result['end_time'] - result['start_time']
     return result
 
+def _scrape_cache_path(url):
+    """Path of the scrape cache entry for a product page URL"""
+    key = hashlib.blake2b(url.encode("utf-8"), digest_size=16).hexdigest()
+    return os.path.join(SCRAPE_CACHE_DIR, f"{key}.json")
+
+def get_cached_retailer_urls(url, ttl=SCRAPE_CACHE_TTL_SECONDS):
+    """
+    Look up the retailer URLs cached for a product page.
+    
+    Returns:
+        list: The cached retailer URLs, or None on a miss or an entry older than ttl seconds
+    """
+    cache_path = _scrape_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(cache_path) >= ttl:
+            os.unlink(cache_path)
+            return None
+        with open(cache_path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+def cache_retailer_urls(url, retailer_urls):
+    """Store the retailer URLs found for a product page in the scrape cache"""
+    try:
+        os.makedirs(SCRAPE_CACHE_DIR, exist_ok=True)
+        cache_path = _scrape_cache_path(url)
+        # Write to a temp file and swap it in so readers never see a partial entry
+        tmp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(retailer_urls))
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning("Failed to write scrape cache entry - %s", e)
+
+def sweep_scrape_cache(ttl=SCRAPE_CACHE_TTL_SECONDS):
+    """Delete scrape cache files (including abandoned temp files) older than ttl seconds"""
+    now = time.time()
+    try:
+        entries = list(os.scandir(SCRAPE_CACHE_DIR))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if now - entry.stat().st_mtime >= ttl:
+                os.unlink(entry.path)
+        except OSError:
+            continue
+
+def feed_work_queue(work_queue, worker_args, num_workers):
+    """
+    Put each scrape job on work_queue, blocking while it is full, then one None sentinel per
+    worker so they all stop.
+    """
+    for args in worker_args:
+        work_queue.put(args)
+    for _ in range(num_workers):
+        work_queue.put(None)
+
+def scrape_worker(work_queue, result_queue):
+    """
+    Run scrape jobs from work_queue until a None sentinel arrives, putting each result (or
+    the exception it raised) on result_queue.
+    """
+    while True:
+        args = work_queue.get()
+        if args is None:
+            break
+        try:
+            result_queue.put(scrape_single_url(args))
+        except Exception as e:
+            result_queue.put(e)
+
+def write_json_atomic(data, path):
+    """
+    Write data as indented JSON to a temporary file next to path, then rename it over path so
+    readers never see a partially written file.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    os.replace(tmp_path, path)
+
+def progress_writer(save_queue, progress_file, log_mode='wb'):
+    """
+    Own the checkpoint files until a None sentinel arrives on save_queue: ('record', dict)
+    items are appended to progress_file + ".ndjson" in order, and ('stats', dict) snapshots
+    are written to progress_file. Runs on its own thread so scraping never waits on disk; if
+    snapshots pile up, only the newest one is written.
+    """
+    with open(f"{progress_file}.ndjson", log_mode) as checkpoint_log:
+        stop = False
+        while not stop:
+            items = [save_queue.get()]
+            
+            # Handle everything that is already queued in one go
+            while True:
+                try:
+                    items.append(save_queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            snapshot = None
+            for item in items:
+                if item is None:
+                    stop = True
+                elif item[0] == 'record':
+                    checkpoint_log.write(orjson.dumps(item[1]) + b"\n")
+                else:
+                    snapshot = item[1]
+            checkpoint_log.flush()
+            
+            if snapshot is not None:
+                try:
+                    write_json_atomic(snapshot, progress_file)
+                    print(f"📁 Progress saved to {progress_file}")
+                except Exception as e:
+                    print(f"❌ Error saving progress: {e}")
+
+def load_checkpoint(progress_file, config_hash):
+    """
+    Load the outcomes of a previous run from progress_file + ".ndjson".
+    
+    Args:
+        progress_file (str): Progress file of the previous run
+        config_hash (str): Hash of the current scraping settings
+    
+    Returns:
+        list: Checkpoint records of the previous run, or None if there is nothing to resume
+              or it was run with different settings
+    """
+    log_file = f"{progress_file}.ndjson"
+    if not (os.path.exists(progress_file) and os.path.exists(log_file)):
+        return None
+    
+    try:
+        with open(progress_file, 'rb') as f:
+            prior_stats = orjson.loads(f.read()).get('stats', {})
+    except (OSError, ValueError) as e:
+        print(f"⚠️  Could not read {progress_file}, starting fresh: {e}")
+        return None
+    
+    if prior_stats.get('config_hash') != config_hash:
+        print(f"⚠️  Scraping settings changed since {progress_file} was written, starting fresh")
+        return None
+    
+    records = []
+    with open(log_file, 'rb') as f:
+        for line in f:
+            try:
+                records.append(orjson.loads(line))
+            except ValueError:
+                # A crash can leave the last line half written
+                continue
+    return records
+
 def parallel_scrape_google_products(urls, delay=0, max_workers=20, max_retries=2, 
                                    backoff_factor=2.0, save_progress=True, 
-                                   progress_file="parallel_scraping_progress.json"):
+                                   progress_file="parallel_scraping_progress.json",
+                                   resume=True, max_delay=30.0, jitter=1.0,
+                                   rate_limit_mode=None, use_cache=True,
+                                   cache_ttl=SCRAPE_CACHE_TTL_SECONDS):
     """
     Scrape multiple Google Shopping product pages in parallel.
     
@@ -1662,84 +1938,215 @@ def parallel_scrape_google_products(urls, delay=0, max_workers=20, max_retries=2
         max_retries (int): Maximum number of retries for failed requests
         backoff_factor (float): Multiplier for exponential backoff
         save_progress (bool): Save progress to file
-        progress_file (str): File to save progress to
+        progress_file (str): File to save progress to. While scraping it holds the running
+            stats, and each finished URL is appended to progress_file + ".ndjson"; the full
+            results are written to it at the end
+        resume (bool): After an interrupted run with the same settings that saved to
+            progress_file, skip the URLs of this list it already scraped successfully; failed
+            URLs are retried. A run that completes removes its checkpoint log
+        max_delay (float): Longest backoff before a retry, in seconds (default: 30)
+        jitter (float): Up to this many random seconds added to each backoff (default: 1)
+        rate_limit_mode (str): Name of a RATE_LIMIT_PRESETS entry; when given, its delay,
+            max_workers, max_retries and backoff_factor replace the arguments above
+        use_cache (bool): Reuse retailer URLs scraped for the same page within cache_ttl
+            seconds, and cache newly scraped ones
+        cache_ttl (int): How long cached retailer URLs stay fresh, in seconds (default: 1 day)
+    
+    URLs that differ only in tracking parameters (see normalize_google_url) are scraped once;
+    the stats count distinct pages.
     
     Returns:
         dict: Results with URLs as keys and retailer URLs as values, plus metadata
     """
     
-    # Thread-safe lock for shared data
-    lock = threading.Lock()
+    if rate_limit_mode is not None:
+        if rate_limit_mode not in RATE_LIMIT_PRESETS:
+            raise ValueError(f"Unknown rate_limit_mode {rate_limit_mode!r}; "
+                             f"expected one of {', '.join(RATE_LIMIT_PRESETS)}")
+        preset = RATE_LIMIT_PRESETS[rate_limit_mode]
+        delay = preset["delay"]
+        max_workers = preset["max_workers"]
+        max_retries = preset["max_retries"]
+        backoff_factor = preset["backoff_factor"]
+    
+    # Settings that change what a run produces; a checkpoint written with other settings is
+    # not resumed
+    config_hash = hashlib.md5(json.dumps([max_workers, delay, backoff_factor]).encode()).hexdigest()
+    
+    # URLs that only differ in tracking parameters are the same page: scrape each page once
+    # and report its result under every URL that was passed for it
+    url_groups = {}
+    for url in urls:
+        url_groups.setdefault(normalize_google_url(url), []).append(url)
+    duplicate_urls = len(urls) - len(url_groups)
+    urls = list(url_groups)
+    total_urls = len(urls)
     
     results = {
         'successful': {},
         'failed': {},
         'stats': {
-            'total_urls': len(urls),
+            'total_urls': total_urls,
             'successful_count': 0,
             'failed_count': 0,
             'start_time': datetime.now().isoformat(),
             'rate_limit_hits': 0,
             'total_requests': 0,
             'max_workers': max_workers,
-            'base_delay': delay
+            'base_delay': delay,
+            'config_hash': config_hash,
+            'cache_hits': 0,
+            'total_links_found': 0,
+            'duplicate_urls': duplicate_urls
         }
     }
     
+    if not urls:
+        print("No URLs to scrape")
+        return results
+    
+    prior_records = load_checkpoint(progress_file, config_hash) if save_progress and resume else None
+    if prior_records:
+        # Only successful pages from this URL list count as done; failed ones are retried
+        for record in prior_records:
+            url = record['url']
+            if not record['success'] or url not in url_groups or url in results['successful']:
+                continue
+            results['successful'][url] = record['retailer_urls']
+            results['stats']['total_links_found'] += len(record['retailer_urls'])
+            results['stats']['total_requests'] += record['attempts']
+            if record['rate_limited']:
+                results['stats']['rate_limit_hits'] += 1
+        results['stats']['successful_count'] = len(results['successful'])
+        
+        urls = [url for url in urls if url not in results['successful']]
+        print(f"♻️  Resuming from {progress_file}: {total_urls - len(urls)} URLs already done")
+    
+    if use_cache:
+        # Entries this run would treat as expired are dropped rather than left on disk
+        sweep_scrape_cache(cache_ttl)
+        to_fetch = []
+        for url in urls:
+            cached = get_cached_retailer_urls(url, cache_ttl)
+            if cached:
+                results['successful'][url] = cached
+                results['stats']['successful_count'] += 1
+                results['stats']['cache_hits'] += 1
+                results['stats']['total_links_found'] += len(cached)
+            else:
+                to_fetch.append(url)
+        if len(to_fetch) < len(urls):
+            print(f"📦 {len(urls) - len(to_fetch)} URLs served from the scrape cache")
+        urls = to_fetch
+    
+    # No point starting more threads than there are URLs; all workers share _SCRAPE_SESSION's pool
+    max_workers = max(1, min(max_workers, len(urls)))
+    results['stats']['max_workers'] = max_workers
+    
     print(f"🚀 Starting PARALLEL scraping of {len(urls)} URLs...")
     print(f"⚡ Max workers: {max_workers}, Base delay: {delay}s, Max retries: {max_retries}")
     print("⚠️  WARNING: Parallel processing with 0 delay will likely trigger rate limits quickly!")
     print("-" * 80)
     
     # Prepare arguments for parallel execution
-    worker_args = [(url, delay, max_retries, backoff_factor, i) 
-                   for i, url in enumerate(urls)]
+    worker_args = ((url, delay, max_retries, backoff_factor, max_delay, jitter, i) 
+                   for i, url in enumerate(urls))
     
     completed_count = 0
+    # Successes among this run's fetches; successful_count also includes resumed and cached URLs
+    run_successful_count = 0
     start_time = time.time()
     
-    # Execute in parallel
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all tasks
-        future_to_url = {executor.submit(scrape_single_url, args): args[0] 
-                        for args in worker_args}
-        
-        # Process completed tasks as they finish
-        for future in as_completed(future_to_url):
-            with lock:  # Thread-safe access to shared results
-                result = future.result()
-                completed_count += 1
-                
-                results['stats']['total_requests'] += result['attempts']
-                
-                if result['success']:
-                    results['successful'][result['url']] = result['retailer_urls']
-                    results['stats']['successful_count'] += 1
-                else:
-                    results['failed'][result['url']] = result['error']
-                    results['stats']['failed_count'] += 1
-                
-                if result['rate_limited']:
-                    results['stats']['rate_limit_hits'] += 1
-                
-                # Print progress update
-                elapsed = time.time() - start_time
-                progress_pct = (completed_count / len(urls)) * 100
-                success_rate = (results['stats']['successful_count'] / completed_count) * 100
-                
-                print(f"[{completed_count}/{len(urls)}] ({progress_pct:.1f}%) "
-                      f"Success: {success_rate:.1f}% | "
-                      f"Rate limits: {results['stats']['rate_limit_hits']} | "
-                      f"Elapsed: {elapsed:.1f}s")
-                
-                # Save progress periodically (every 10 completions)
-                if save_progress and completed_count % 10 == 0:
-                    try:
-                        with open(progress_file, 'w') as f:
-                            json.dump(results, f, indent=2)
-                        print(f"📁 Progress saved to {progress_file}")
-                    except Exception as e:
-                        print(f"❌ Error saving progress: {e}")
+    # A background thread appends each finished URL to the NDJSON log and writes the periodic
+    # stats saves, so the aggregation loop below never touches the disk
+    save_queue = None
+    if save_progress:
+        save_queue = queue.Queue()
+        writer_thread = threading.Thread(target=progress_writer,
+                                         args=(save_queue, progress_file, 'ab' if prior_records else 'wb'),
+                                         daemon=True)
+        writer_thread.start()
+        # Write the stats header (with config_hash) up front so a run that dies early can resume
+        save_queue.put(('stats', {'stats': dict(results['stats'])}))
+    
+    # Execute in parallel: a producer thread feeds a bounded work queue, so only a few URLs
+    # are queued at a time however many there are, and long-lived workers pull from it
+    work_queue = queue.Queue(maxsize=2 * max_workers)
+    result_queue = queue.SimpleQueue()
+    producer_thread = threading.Thread(target=feed_work_queue,
+                                       args=(work_queue, worker_args, max_workers), daemon=True)
+    worker_threads = [threading.Thread(target=scrape_worker, args=(work_queue, result_queue), daemon=True)
+                      for _ in range(max_workers)]
+    producer_thread.start()
+    for worker_thread in worker_threads:
+        worker_thread.start()
+    
+    # Process results as they finish. Results are only touched from this thread, so no lock is
+    # needed; periodic saves are handed to the writer thread
+    for _ in range(len(urls)):
+        result = result_queue.get()
+        if isinstance(result, BaseException):
+            raise result
+        completed_count += 1
+        
+        results['stats']['total_requests'] += result['attempts']
+        
+        if result['success']:
+            results['successful'][result['url']] = result['retailer_urls']
+            results['stats']['successful_count'] += 1
+            run_successful_count += 1
+            results['stats']['total_links_found'] += len(result['retailer_urls'])
+            if use_cache:
+                cache_retailer_urls(result['url'], result['retailer_urls'])
+        else:
+            results['failed'][result['url']] = result['error']
+            results['stats']['failed_count'] += 1
+        
+        if result['rate_limited']:
+            results['stats']['rate_limit_hits'] += 1
+        
+        if save_queue is not None:
+            save_queue.put(('record', {
+                'url': result['url'],
+                'success': result['success'],
+                'retailer_urls': result['retailer_urls'],
+                'error': result['error'],
+                'attempts': result['attempts'],
+                'rate_limited': result['rate_limited']
+            }))
+        
+        # Print progress update
+        elapsed = time.time() - start_time
+        progress_pct = (completed_count / len(urls)) * 100
+        success_rate = (run_successful_count / completed_count) * 100
+        
+        print(f"[{completed_count}/{len(urls)}] ({progress_pct:.1f}%) "
+              f"Success: {success_rate:.1f}% | "
+              f"Rate limits: {results['stats']['rate_limit_hits']} | "
+              f"Elapsed: {elapsed:.1f}s")
+        
+        # Save running stats periodically (every 10 completions); per-URL results are
+        # already in the NDJSON log
+        if save_queue is not None and completed_count % 10 == 0:
+            save_queue.put(('stats', {'stats': dict(results['stats'])}))
+    
+    for worker_thread in worker_threads:
+        worker_thread.join()
+    
+    # Let the writer finish any pending snapshot before the final save. The run finished, so
+    # its checkpoint log is removed; only an interrupted run leaves one behind to resume
+    if save_queue is not None:
+        save_queue.put(None)
+        writer_thread.join()
+        try:
+            os.remove(f"{progress_file}.ndjson")
+        except OSError as e:
+            print(f"⚠️  Could not remove checkpoint log {progress_file}.ndjson: {e}")
+    
+    for key in ('successful', 'failed'):
+        results[key] = {original: value
+                        for url, value in results[key].items()
+                        for original in url_groups.get(url, (url,))}
     
     # Calculate final stats
     total_time = time.time() - start_time
@@ -1750,8 +2157,7 @@ def parallel_scrape_google_products(urls, delay=0, max_workers=20, max_retries=2
     # Final save
     if save_progress:
         try:
-            with open(progress_file, 'w') as f:
-                json.dump(results, f, indent=2)
+            write_json_atomic(results, progress_file)
             print(f"💾 Final results saved to {progress_file}")
         except Exception as e:
             print(f"❌ Error saving final results: {e}")
@@ -1760,9 +2166,10 @@ def parallel_scrape_google_products(urls, delay=0, max_workers=20, max_retries=2
     print("\n" + "=" * 80)
     print("🏁 FINAL PARALLEL SCRAPING RESULTS")
     print("=" * 80)
-    print(f"📊 Total URLs processed: {len(urls)}")
-    print(f"✅ Successful: {results['stats']['successful_count']} ({(results['stats']['successful_count']/len(urls)*100):.1f}%)")
-    print(f"❌ Failed: {results['stats']['failed_count']} ({(results['stats']['failed_count']/len(urls)*100):.1f}%)")
+    print(f"📊 Total URLs processed: {total_urls}")
+    print(f"✅ Successful: {results['stats']['successful_count']} ({(results['stats']['successful_count']/total_urls*100):.1f}%)")
+    print(f"❌ Failed: {results['stats']['failed_count']} ({(results['stats']['failed_count']/total_urls*100):.1f}%)")
+    print(f"🔗 Retailer URLs found: {results['stats']['total_links_found']}")
     print(f"🚫 Rate limit hits: {results['stats']['rate_limit_hits']}")
     print(f"📈 Total requests made: {results['stats']['total_requests']}")
     print(f"⏱️  Total duration: {total_time:.2f} seconds")
@@ -1771,7 +2178,7 @@ def parallel_scrape_google_products(urls, delay=0, max_workers=20, max_retries=2
     
     # Rate limiting analysis
     if results['stats']['rate_limit_hits'] > 0:
-        rate_limit_percentage = (results['stats']['rate_limit_hits'] / len(urls)) * 100
+        rate_limit_percentage = (results['stats']['rate_limit_hits'] / total_urls) * 100
         print(f"⚠️  Rate limiting detected on {rate_limit_percentage:.1f}% of requests")
         print("💡 Consider reducing max_workers or adding delays")
     else:
@@ -1785,7 +2192,8 @@ if __name__ == "__main__":
     google_shopping_urls = ["https://www.google.com/shopping/product/3356952053188629036?gl=us"]
     
     print("Extracting retailer URLs...")
-    urls = parallel_scrape_google_products(google_shopping_urls)
+    results = parallel_scrape_google_products(google_shopping_urls, rate_limit_mode="fast")
+    urls = [url for retailer_urls in results['successful'].values() for url in retailer_urls]
     
     print(f"\nFound {len(urls)} retailer URLs:")
     for i, url in enumerate(urls, 1):